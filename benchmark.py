@@ -0,0 +1,213 @@
+"""Team Rankings benchmarks.
+
+Synopsis
+==========
+
+    benchmark.py [--teams 2000] [--games-per-team 10] [--leagues 4]
+        [--scores football] [-d '|'] [--save baseline.json]
+        [--compare baseline.json]
+
+Options
+==========
+
+The "--teams", "--games-per-team", "--leagues", "--cross" and "--scores"
+options describe a synthetic season.  Teams are split evenly into leagues.
+Most games are played within a league; the "--cross" fraction of games
+are played between leagues, which connects them.  "--scores" is one of
+``football``, ``basketball`` or ``hockey`` and picks both the score
+distribution and the :class:`rankings.SportFactor`.  "--seed" makes
+the season reproducible; the same options always produce the same file.
+
+The "-d" option is the file format, as for ``rankings.py``: CSV by
+default, ``|`` for pipe-delimited.
+
+The "--engine" and "--solver" options are passed to the rating solve.
+
+The "--write" option saves the synthetic season to a file instead of
+timing it.
+
+The "--save" option writes the timings to a JSON baseline file.  The
+"--compare" option reads a baseline and shows each timing as a ratio
+of the baseline, so regressions show up as numbers.
+
+Each stage is timed "--repeat" times and the fastest time is kept:
+
+-   ``read``: parse the text into a :class:`rankings.Schedule`.
+
+-   ``load``: :func:`rankings.load`, which reads and solves.
+
+-   ``solve``: the rating solve alone, with its iteration count
+    and the time per iteration.
+
+-   ``report``: :func:`rankings.printRankings`, all formats.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import rankings
+
+
+# Mean and spread of one team's score, and the sport used to rate it.
+SCORES = {
+    'football': (24.0, 12.0, rankings.Football),
+    'basketball': (70.0, 12.0, rankings.Basketball),
+    'hockey': (3.0, 1.7, rankings.SportFactor),
+}
+
+
+def syntheticSeason(teams=2000, games_per_team=10, leagues=4, cross=0.05,
+                    scores='football', seed=1979):
+    """Generate a deterministic synthetic season.
+
+    Yields :class:`rankings.History` instances, one week of games at a time.
+    Each team has a hidden strength that shifts its scores, so the
+    ratings have something to find.
+    """
+    rng = random.Random(seed)
+    mean, spread, _ = SCORES[scores]
+    strength = [rng.gauss(0.0, spread / 2) for _ in range(teams)]
+    groups = [list(range(league, teams, leagues)) for league in range(leagues)]
+    opening = datetime.date(1979, 9, 1)
+
+    def score(team, opponent):
+        return max(0, round(rng.gauss(mean + strength[team] - strength[opponent], spread)))
+
+    for week in range(games_per_team):
+        date = (opening + datetime.timedelta(weeks=week)).isoformat()
+        pairs = []
+        for group in groups:
+            rng.shuffle(group)
+            pairs.append(list(zip(group[0::2], group[1::2])))
+        # Rewire some pairs across leagues: (a, b), (c, d) become (a, d), (c, b).
+        for _ in range(round(cross * teams / 2)):
+            if leagues < 2:
+                break
+            one, other = rng.sample(range(leagues), 2)
+            if not pairs[one] or not pairs[other]:
+                continue
+            i, j = rng.randrange(len(pairs[one])), rng.randrange(len(pairs[other]))
+            (a, b), (c, d) = pairs[one][i], pairs[other][j]
+            pairs[one][i], pairs[other][j] = (a, d), (c, b)
+        for league in pairs:
+            for team1, team2 in league:
+                yield rankings.History(date, 'Team {0}'.format(team1), score(team1, team2),
+                                       'Team {0}'.format(team2), score(team2, team1))
+
+
+def writeSeason(history, target, delimiter=None):
+    """Write History instances as CSV with column titles, or pipe-delimited
+    without them if ``delimiter`` is ``'|'``."""
+    if delimiter == '|':
+        for h in history:
+            target.write('{0.date}|{0.team1}|{0.score1}|{0.team2}|{0.score2}\n'.format(h))
+    else:
+        target.write('date,team1,score1,team2,score2\n')
+        for h in history:
+            target.write('{0.date},{0.team1},{0.score1},{0.team2},{0.score2}\n'.format(h))
+
+
+def best(function, repeat):
+    """Run ``function`` ``repeat`` times; return the fastest time and the last result."""
+    fastest = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        fastest = min(fastest, time.perf_counter() - start)
+    return fastest, result
+
+
+def runBenchmark(text, reader_class, sport, engine='python', solver='fixed', repeat=3):
+    """Time each stage on the text of a season.  Returns a dict of timings."""
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    timings = {}
+
+    timings['read'], schedule = best(
+        lambda: reader_class(io.StringIO(text)).schedule(sport), repeat)
+
+    with quiet:
+        timings['load'], (_, _, TeamList) = best(
+            lambda: rankings.load(reader_class(io.StringIO(text)), sport, engine, solver),
+            repeat)
+
+    calc = rankings.SOLVERS[solver] or rankings.ENGINES[engine]
+
+    def solve():
+        teams = schedule.teamTable().teams()
+        return calc(teams, len(schedule), schedule)
+
+    timings['solve'], result = best(solve, repeat)
+    timings['iterations'] = result.iterations
+    timings['per_iteration'] = timings['solve'] / max(result.iterations, 1)
+
+    with tempfile.TemporaryDirectory() as directory, quiet:
+        args = argparse.Namespace(output=str(Path(directory) / 'rankings.txt'),
+                                  csv_output=None, formats=list(rankings.REPORT_FORMATS))
+        timings['report'], _ = best(lambda: rankings.printRankings(args, TeamList), repeat)
+    return timings
+
+
+def printTimings(timings, baseline=None):
+    """Print the timings, and their ratio to a baseline's."""
+    for name, value in timings.items():
+        line = '{0:>14s} {1:12.6f}'.format(name, value)
+        if baseline and baseline.get(name):
+            line += ' {0:8.2f}x baseline'.format(value / baseline[name])
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rankings benchmarks')
+    parser.add_argument('--teams', type=int, default=2000)
+    parser.add_argument('--games-per-team', type=int, default=10)
+    parser.add_argument('--leagues', type=int, default=4)
+    parser.add_argument('--cross', type=float, default=0.05,
+                        help='Fraction of games played between leagues')
+    parser.add_argument('--scores', choices=list(SCORES), default='football')
+    parser.add_argument('--seed', type=int, default=1979)
+    parser.add_argument('-d', dest='format', action='store')
+    parser.add_argument('--engine', choices=sorted(rankings.ENGINES), default='python')
+    parser.add_argument('--solver', choices=list(rankings.SOLVERS), default='fixed')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--write', metavar='FILE', help='Write the season instead of timing it')
+    parser.add_argument('--save', metavar='FILE', help='Save the timings as a baseline')
+    parser.add_argument('--compare', metavar='FILE', help='Compare with a saved baseline')
+    args = parser.parse_args()
+
+    reader_class = rankings.readerClass(args.format)
+
+    season = syntheticSeason(args.teams, args.games_per_team, args.leagues,
+                             args.cross, args.scores, args.seed)
+    if args.write:
+        with open(args.write, 'w') as target:
+            writeSeason(season, target, args.format)
+        return
+
+    text = io.StringIO()
+    writeSeason(season, text, args.format)
+    sport = SCORES[args.scores][2]()
+    timings = runBenchmark(text.getvalue(), reader_class, sport,
+                           args.engine, args.solver, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as source:
+            baseline = json.load(source)['timings']
+    printTimings(timings, baseline)
+
+    if args.save:
+        parameters = {name: value for name, value in vars(args).items()
+                      if name not in ('write', 'save', 'compare')}
+        with open(args.save, 'w') as target:
+            json.dump({'parameters': parameters, 'timings': timings}, target, indent=2)
+
+
+if __name__ == "__main__":
+    main()
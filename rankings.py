@@ -21,6 +21,107 @@ team2, score2.
 For scores extracted from web sites, a separate parser should be used
 to create the required CSV file
 
+History files may be compressed with gzip, bzip2 or xz; the format is
+recognized from the file's first bytes, not its name, and the file is
+decompressed as it's read.  A file name of ``-`` reads standard input, which
+may be compressed too.  Each file is a separate season unless the "--concat"
+option is given, which ranks all the files together as one season.
+
+A "--dedup" option finds games that appear more than once, such as the
+same game from two feeds with the teams swapped or the date written
+differently.  Games match on their date, both teams in either order, and
+their scores; the same teams on the same date with different scores are a
+conflict.  ``--dedup drop`` keeps the first version of each game;
+``--dedup flag`` keeps every game but lists the repeats on standard error.
+Either way the counts are reported.  With "--ingest", games already in the
+state count too.
+
+A "--engine" option selects the rating engine.  The default, ``python``,
+iterates over the games one at a time.  ``numpy`` computes each iteration
+with whole-array operations, which is much faster for large schedules.
+``chunked`` is the same computation over a fixed number of games at a time,
+for histories too large to fit in memory: the games are streamed into a
+schedule file on disk (in the "--cache" directory, if there is one) and
+read from it, so memory use depends on the number of teams, not games.
+Both require the numpy package.
+
+A "--solver" option selects how the ratings are solved.  The default,
+``fixed``, nudges each rating by a fixed step until the ratings settle.
+``newton`` solves for the same fixed point with Newton steps, which
+usually takes a handful of sweeps instead of thousands.  It also
+requires numpy.  Either way, the number of times the scores were examined
+(passes over the games) and the final residual (the largest change one more
+step would make) are reported.  A Newton step takes many passes, for its
+linear solve and line search, so its number of steps is reported too.
+
+A "--home-field" option also solves for the advantage of playing at home,
+in rating points, which is reported.  Team2 of each game is the home team;
+the history files have no column for neutral sites.  Predictions for
+"--predict" games add the advantage to team2; "--all-pairs" predictions are
+for a neutral site.  It applies to "--ingest", which saves the advantage
+in the state, "--timeline" and "--bootstrap", but can't be combined with
+"--components": the advantage is shared by every group.  Whether or not it's
+given, the "jsonl" report lists each team's record at home and as the
+visitor.
+
+A "--jobs" option processes several history files at once, each in its
+own process.  The reports are printed in the order the files were given.
+When more than one file is given, each file's name is added to the output
+file names, so ``--output ranks.txt`` writes ``ranks_scores1979.txt`` and
+the default CSV file becomes ``rankings_scores1979.csv``.  A compression
+suffix is left out, and files with the same name also get their directory's
+name, ``rankings_y1_scores.csv``.
+
+When some teams never play each other, even indirectly, a warning lists the
+separate groups of teams; ratings can only be compared within a group.  A
+"--components" option solves each group separately, so a group that has
+settled isn't recomputed while another one converges.  With "--jobs", the
+groups are solved in parallel.
+
+A "--ingest" option names a ranking state file.  The games in the history
+files are added to the games already in the state (it's created if it doesn't
+exist), the ratings are re-solved starting from the saved ones, and the state
+is saved again.  This is the quick way to add a weekend's results.
+
+A "--predict" option names a file of upcoming games.  Instead of the usual
+report, the expected result for team1 of each game is written as CSV to the
+"--output" file or the console.  The file uses the same "-d" format as the
+history: CSV with 'team1' and 'team2' columns (and optionally 'date'), or
+``date|team1|team2``.  A "--all-pairs" option predicts every pairing of teams
+instead, or every pairing of the teams listed, one per line, in the "--teams"
+file.  Both work with "--ingest", using the saved ratings.
+
+A "--bootstrap" option, with a number N, resamples the season's games N
+times and solves each resample, and writes each team's rating and rank
+intervals as CSV instead of the usual report.  The "--confidence" option sets
+the coverage of the intervals, 0.95 by default.  With "--jobs", the resamples
+are solved in parallel.
+
+A "--timeline" option, with a number N, writes the ratings as of every N-th
+date of the season (and the last date) instead of the usual report.  The
+output is a CSV matrix with one row per team and one column per date, written
+to the "--output" file or the console.  Each date starts from the previous
+date's ratings, so this is much faster than ranking each week separately.
+
+A "--profile" option writes a one-line JSON summary for each history file
+to standard error: the time spent parsing, building the games, solving and
+reporting, and the solver's iteration count, residual and convergence.
+
+A "--cache" option names a directory for pre-parsed schedules.  The first
+run over a history file stores its parsed schedule there; later runs over
+the same file content, format and sport read it back instead of parsing.
+
+A "--result-cache" option names a directory for solved ratings.  A run
+over the same games, sport, engine and solver as an earlier one reuses its
+ratings instead of solving again.  The least recently used entries are
+removed once the directory holds more than 256 MB.
+
+A "--format" option selects a report format: ``text``, ``csv`` or ``jsonl``
+(JSON Lines).  It can be repeated.  The default is text and CSV.  The text
+table goes to the "--output" file, or the console; the CSV and JSON Lines
+files are named after the output file, or ``rankings.csv`` and
+``rankings.jsonl``.
+
 A "--output" option specifies the output file. This option generates an
 output file containing the rankings.
 
@@ -45,12 +146,38 @@ This is a Python 3.12 application.
 
 import math
 import csv
+import datetime
+from array import array
 from collections import namedtuple
 import argparse
-from dataclasses import dataclass, field
+import bz2
+import contextlib
+import functools
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import lzma
+import mmap
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
 from typing import Callable, Literal
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    # The array-backed engine is optional; the pure Python engine
+    # is always available.
+    np = None
+
 
 # Raw input is a History record.
 # Could be read via some kind of CSV reader, but numerous other
@@ -80,15 +207,31 @@ class SportFactor:
     """
     score_factor: float = 100.0
     max_score: float = 1.0
+    #: Adjusted scores are raised to this power; the golden ratio.
+    exponent: float = (1 + pow(5, 0.5)) / 2.0
+    _ratios: array | None = field(default=None, init=False, repr=False, compare=False)
+
+    #: Scores below this are looked up in the :meth:`gameRatioTable`.
+    table_size = 201
+
+    # Tables already built, shared by instances with the same parameters.
+    # Only the :attr:`table_entries` most recently used are kept.
+    tables = {}
+    table_entries = 8
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in ('score_factor', 'max_score', 'exponent'):
+            # The cached table depends on these.
+            object.__setattr__(self, '_ratios', None)
 
     def adjustScore(self, score):
         '''We adjust the score here to prevent a team from running up the
         score.
         '''
 
-        golden = (1 + pow(5, 0.5)) / 2.0
         adjscore = score - ((score ** 2) / self.score_factor)
-        adjusted_score = pow(adjscore / self.max_score, golden)
+        adjusted_score = pow(adjscore / self.max_score, self.exponent)
         return adjusted_score
 
     def gameRatio(self, score1, score2):
@@ -106,8 +249,12 @@ class SportFactor:
         whereas if the teams tie each team receives an additional 0.5 points.
         '''
 
-        adjusted_score_1 = self.adjustScore(score1)
-        adjusted_score_2 = self.adjustScore(score2)
+        return self.pairRatio(self.adjustScore(score1), self.adjustScore(score2),
+                              score1, score2)
+
+    @staticmethod
+    def pairRatio(adjusted_score_1, adjusted_score_2, score1, score2):
+        """The game ratio, given both adjusted scores.  See :meth:`gameRatio`."""
         game_ratio = (adjusted_score_1 + 1.0) / (adjusted_score_1 + adjusted_score_2 + 2.0)
         if score1 > score2:
             game_ratio += 1.05
@@ -119,6 +266,50 @@ class SportFactor:
             raise Exception("Horrifying Design Error")
         return game_ratio * 0.5
 
+    def gameRatioTable(self):
+        """A cached table of :meth:`gameRatio` for every pair of small scores.
+
+        Returns ``(table, size)``; the ratio for ``score1, score2`` is
+        ``table[score1 * size + score2]`` when both scores are below
+        ``size``.  The table covers scores up to :attr:`table_size`, but
+        never beyond ``score_factor``, where :meth:`adjustScore` stops
+        making sense.  It's rebuilt if ``score_factor``, ``max_score`` or
+        ``exponent`` change.  Instances with the same parameters share one
+        table while it's among the :attr:`table_entries` most recently used.
+        """
+        size = int(min(self.table_size, self.score_factor + 1))
+        if self._ratios is None:
+            key = type(self), self.score_factor, self.max_score, self.exponent, size
+            table = self.tables.pop(key, None)
+            if table is None:
+                adjusted = [self.adjustScore(score) for score in range(size)]
+                table = array('d', (
+                    self.pairRatio(adjusted[score1], adjusted[score2], score1, score2)
+                    for score1 in range(size) for score2 in range(size)))
+            self.tables[key] = table
+            while len(self.tables) > self.table_entries:
+                del self.tables[next(iter(self.tables))]
+            self._ratios = table
+        return self._ratios, size
+
+    def lookupGameRatio(self, score1, score2):
+        """The same value as :meth:`gameRatio`, from the :meth:`gameRatioTable`
+        when the scores are in its range."""
+        table, size = self.gameRatioTable()
+        if 0 <= score1 < size and 0 <= score2 < size:
+            return table[score1 * size + score2]
+        return self.gameRatio(score1, score2)
+
+    def checkedGameRatio(self, score1, score2) -> float:
+        """The :meth:`gameRatio`, or :exc:`ValueError` for scores that
+        have none: negative scores, or ones beyond ``score_factor``, where
+        the adjusted score is no longer a real number."""
+        ratio = self.gameRatio(score1, score2)
+        if not isinstance(ratio, float) or not math.isfinite(ratio):
+            raise ValueError("Invalid scores {0} to {1}: no game ratio for {2}".format(
+                score1, score2, type(self).__name__))
+        return ratio
+
 @dataclass(slots=True)
 class Football(SportFactor):
 
@@ -160,9 +351,12 @@ class Team:
     power: float = 100.0
     sched_strength: float = 0.0
 
-    def updateStats(self, score: int, opponent: int) -> None:
+    def updateStats(self, score: int, opponent: int, home: bool | None = None) -> None:
         """
         For an individual game, record the win/loss and score for this game.
+
+        :param:`home` is True if this team was at home, False if it was
+            the visitor, and None to record only the overall totals.
         """
         self.pf += score
         self.pa += opponent
@@ -170,13 +364,21 @@ class Team:
         match score, opponent:
             case score, opponent if score > opponent:
                 self.won += 1
+                result = 'won'
             case score, opponent if score < opponent:
                 self.lost += 1
+                result = 'lost'
             case score, opponent if score == opponent:
                 self.tied += 1
+                result = 'tied'
             case _:
                 raise Exception("Invalid scores: score and opponent must be non-negative integers")
 
+        if home is not None:
+            prefix = 'h' if home else 'v'
+            for name, value in ((result, 1), ('pf', score), ('pa', opponent)):
+                setattr(self, prefix + name, getattr(self, prefix + name) + value)
+
 
 @dataclass(slots=True)
 class Game:
@@ -202,10 +404,416 @@ class Game:
         self.score1 = int(history.score1)
         self.team2 = history.team2.casefold()
         self.score2 = int(history.score2)
-        self.game_ratio = sport.gameRatio(self.score1, self.score2)
+        self.game_ratio = sport.lookupGameRatio(self.score1, self.score2)
+
+    @classmethod
+    def fromColumns(cls, date, team1, score1, team2, score2, game_ratio):
+        """Build a Game view of one row of a :class:`Schedule`."""
+        game = cls.__new__(cls)
+        game.date = date
+        game.team1 = team1
+        game.score1 = score1
+        game.team2 = team2
+        game.score2 = score2
+        game.game_ratio = game_ratio
+        return game
+
+
+@dataclass(slots=True)
+class TeamTable:
 
+    """Statistics for all teams, stored as columns indexed by team id.
 
-def expectedGameResult(rating1, rating2, x):
+    The ids are the ones assigned by a :class:`Schedule`.  The
+    :meth:`teams` method builds the familiar :class:`Team` objects.
+    """
+    counters = ('won', 'lost', 'tied', 'pf', 'pa',
+                'hwon', 'hlost', 'htied', 'hpf', 'hpa',
+                'vwon', 'vlost', 'vtied', 'vpf', 'vpa')
+    ratings = ('game_rate_accum', 'power', 'sched_strength')
+
+    names: list[str]
+    columns: dict[str, array] = field(default_factory=dict)
+
+    def __post_init__(self):
+        size = len(self.names)
+        for name in self.counters:
+            self.columns.setdefault(name, array('q', bytes(8 * size)))
+        self.columns.setdefault('power', array('d', [100.0]) * size)
+        for name in self.ratings:
+            self.columns.setdefault(name, array('d', bytes(8 * size)))
+
+    def updateStats(self, team: int, score: int, opponent: int,
+                    home: bool | None = None) -> None:
+        """
+        For an individual game, record the win/loss and score for one team.
+        :param:`home` is as for :meth:`Team.updateStats`.
+        """
+        columns = self.columns
+        if score > opponent:
+            result = 'won'
+        elif score < opponent:
+            result = 'lost'
+        else:
+            result = 'tied'
+        prefixes = ('', 'h' if home else 'v') if home is not None else ('',)
+        for prefix in prefixes:
+            columns[prefix + 'pf'][team] += score
+            columns[prefix + 'pa'][team] += opponent
+            columns[prefix + result][team] += 1
+
+    def addSplits(self, team1, score1, team2, score2) -> None:
+        """Add a batch of games to every counter at once, with whole-array
+        operations.  The arguments are :mod:`numpy` arrays; team 2 is the
+        home team."""
+        size = len(self.names)
+        won, lost, tied = score1 > score2, score1 < score2, score1 == score2
+        # (column, team ids, weights): the visitor's, then the home team's.
+        splits = (('vwon', team1, won), ('vlost', team1, lost), ('vtied', team1, tied),
+                  ('vpf', team1, score1), ('vpa', team1, score2),
+                  ('hwon', team2, lost), ('hlost', team2, won), ('htied', team2, tied),
+                  ('hpf', team2, score2), ('hpa', team2, score1))
+        for name, teams, weights in splits:
+            counts = np.bincount(teams, weights, size).astype(np.int64)
+            column = np.frombuffer(self.columns[name], dtype=np.int64)
+            column += counts
+            # The overall counter is the sum of the two splits.
+            total = np.frombuffer(self.columns[name[1:]], dtype=np.int64)
+            total += counts
+
+    def team(self, i: int) -> Team:
+        """A :class:`Team` with the statistics of team id ``i``."""
+        values = {name: column[i] for name, column in self.columns.items()}
+        return Team(self.names[i], **values)
+
+    def teams(self) -> dict[str, Team]:
+        """A mapping from team name to :class:`Team`, in team id order."""
+        return {name: self.team(i) for i, name in enumerate(self.names)}
+
+
+@dataclass(slots=True)
+class Schedule:
+
+    """The games of a season, stored as compact parallel columns.
+
+    Team names (casefolded) and dates are interned to dense integer ids
+    once, as the games are added.  Row ``i`` of every column describes
+    game ``i``.  Iterating over a Schedule, or indexing it, produces
+    :class:`Game` views, so it can stand in for a list of games.
+    """
+    names: list[str] = field(default_factory=list)
+    ids: dict[str, int] = field(default_factory=dict)
+    dates: list[str] = field(default_factory=list)
+    date_ids: dict[str, int] = field(default_factory=dict)
+    date: array = field(default_factory=lambda: array('i'))
+    team1: array = field(default_factory=lambda: array('i'))
+    team2: array = field(default_factory=lambda: array('i'))
+    score1: array = field(default_factory=lambda: array('i'))
+    score2: array = field(default_factory=lambda: array('i'))
+    game_ratio: array = field(default_factory=lambda: array('d'))
+
+    def teamId(self, name: str) -> int:
+        """The id of a (casefolded) team name, assigning a new one if needed."""
+        team = self.ids.get(name)
+        if team is None:
+            team = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return team
+
+    def dateId(self, date: str) -> int:
+        date_id = self.date_ids.get(date)
+        if date_id is None:
+            date_id = self.date_ids[date] = len(self.dates)
+            self.dates.append(date)
+        return date_id
+
+    def add(self, date: str, team1: str, score1: int, team2: str, score2: int,
+            game_ratio: float) -> None:
+        """Add one game, with team names already casefolded."""
+        # The ratio is the one value that can be refused (a complex one,
+        # from an impossible score), so it goes first.
+        self.game_ratio.append(game_ratio)
+        self.date.append(self.dateId(date))
+        self.team1.append(self.teamId(team1))
+        self.score1.append(score1)
+        self.team2.append(self.teamId(team2))
+        self.score2.append(score2)
+
+    def append(self, history: History, sport: SportFactor) -> None:
+        """Add the game described by a :class:`History` record."""
+        score1 = int(history.score1)
+        score2 = int(history.score2)
+        self.add(history.date, history.team1.casefold(), score1,
+                 history.team2.casefold(), score2, sport.lookupGameRatio(score1, score2))
+
+    def extend(self, rows, sport: SportFactor) -> None:
+        """Add games from ``(date, team1, score1, team2, score2)`` rows.
+
+        This is the bulk path used by :meth:`HistoryReader.schedule`; it
+        goes straight from the raw fields to the columns, without
+        building History or Game objects.
+        """
+        ids, date_ids = self.ids, self.date_ids
+        team_id, date_id = self.teamId, self.dateId
+        add_date, add_team1, add_team2 = self.date.append, self.team1.append, self.team2.append
+        add_score1, add_score2 = self.score1.append, self.score2.append
+        add_ratio, game_ratio = self.game_ratio.append, sport.checkedGameRatio
+        ratios, size = sport.gameRatioTable()
+        for date, team1, score1, team2, score2 in rows:
+            # Everything that can fail comes before the first append, so
+            # a bad row leaves the columns the same length.
+            score1 = int(score1)
+            score2 = int(score2)
+            team1 = team1.casefold()
+            team2 = team2.casefold()
+            if 0 <= score1 < size and 0 <= score2 < size:
+                ratio = ratios[score1 * size + score2]
+            else:
+                ratio = game_ratio(score1, score2)
+            t1 = ids.get(team1)
+            if t1 is None:
+                t1 = team_id(team1)
+            t2 = ids.get(team2)
+            if t2 is None:
+                t2 = team_id(team2)
+            d = date_ids.get(date)
+            if d is None:
+                d = date_id(date)
+            add_date(d)
+            add_team1(t1)
+            add_score1(score1)
+            add_team2(t2)
+            add_score2(score2)
+            add_ratio(ratio)
+
+    def subset(self, indexes) -> 'Schedule':
+        """A new Schedule of the given games, in the given order.
+
+        Teams and dates are interned again, so only the teams that play
+        in those games have ids.
+        """
+        subset = Schedule()
+        names, dates = self.names, self.dates
+        for i in indexes:
+            subset.add(dates[self.date[i]], names[self.team1[i]], self.score1[i],
+                       names[self.team2[i]], self.score2[i], self.game_ratio[i])
+        return subset
+
+    def components(self, labels=None) -> list[list[int]]:
+        """Split the games into connected groups of teams.
+
+        Returns a list of game indexes for each group, largest group
+        first.  Teams in different groups never play each other, even
+        indirectly, so their ratings can't be compared.  ``labels`` are
+        the team labels from :func:`componentLabels`, if they've already
+        been computed.
+        """
+        if labels is None:
+            labels = componentLabels(self.team1, self.team2, len(self.names))
+        groups = {}
+        for i, team in enumerate(self.team1):
+            groups.setdefault(labels[team], []).append(i)
+        return sorted(groups.values(), key=len, reverse=True)
+
+    # The binary file format of save and open.
+    magic = b'TRSCHED1'
+    columns = ('date', 'team1', 'score1', 'team2', 'score2', 'game_ratio')
+
+    def inMemory(self) -> 'Schedule':
+        """This Schedule, or for a memory-mapped one, a copy with its
+        columns read into memory.  Mapped columns can't be pickled, so
+        this is what's sent to other processes."""
+        mapped = {name: getattr(self, name) for name in self.columns
+                  if isinstance(getattr(self, name), memoryview)}
+        if not mapped:
+            return self
+        columns = {}
+        for name, view in mapped.items():
+            columns[name] = array(view.format)
+            columns[name].frombytes(view.cast('B'))
+        return replace(self, **columns)
+
+    def digest(self) -> str:
+        """A hash of the games: the team names, dates and columns.
+
+        Game order is part of the hash, because the fixed-step solver's
+        result depends on it.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.names, self.dates]).encode())
+        for name in self.columns:
+            digest.update(name.encode())
+            digest.update(getattr(self, name))
+        return digest.hexdigest()
+
+    def save(self, path, **extra) -> None:
+        """Write the Schedule to a binary file.
+
+        The file is a small JSON header (the team names, dates, column
+        layout and any ``extra`` values) followed by the raw column arrays.
+        It's written to a temporary file and renamed, so concurrent
+        readers never see a partial file.
+        """
+        columns = [getattr(self, name) for name in self.columns]
+        self.writeFile(path, len(self), [(c.typecode, c.itemsize * len(c), c.tofile)
+                                         for c in columns], extra)
+
+    def writeFile(self, path, games, columns, extra) -> None:
+        """Write the file format of :meth:`save`: this Schedule's names
+        and dates, and for each of :attr:`columns` a ``(typecode, length,
+        write)`` triple, where ``write(f)`` writes ``length`` bytes."""
+        path = Path(path)
+        header = {'byteorder': sys.byteorder, 'games': games,
+                  'names': self.names, 'dates': self.dates, 'columns': [],
+                  'extra': extra}
+        # Column offsets are relative to the end of the header.
+        offset = 0
+        for name, (typecode, length, _) in zip(self.columns, columns):
+            header['columns'].append([name, typecode, offset, length])
+            offset += length
+        text = json.dumps(header).encode()
+        text += b' ' * (-(len(self.magic) + 8 + len(text)) % 8)
+        fd, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.magic)
+                f.write(len(text).to_bytes(8, 'little'))
+                f.write(text)
+                for _, _, write in columns:
+                    write(f)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    @classmethod
+    def saveRows(cls, path, rows, sport: SportFactor, chunk_size: int = 1 << 16,
+                 **extra) -> None:
+        """Parse ``(date, team1, score1, team2, score2)`` rows straight
+        into a file in the format of :meth:`save`.
+
+        Only ``chunk_size`` games are held in memory at a time; each
+        chunk's columns are spilled to temporary files next to ``path``
+        and copied into place at the end.  Memory use depends on the
+        number of teams and dates, not games.
+        """
+        schedule = cls()
+        games = 0
+        with tempfile.TemporaryDirectory(dir=Path(path).parent) as directory, \
+                contextlib.ExitStack() as stack:
+            spills = [stack.enter_context(open(Path(directory) / name, 'w+b'))
+                      for name in cls.columns]
+            rows = iter(rows)
+            while chunk := list(itertools.islice(rows, chunk_size)):
+                schedule.extend(chunk, sport)
+                games += len(chunk)
+                for name, spill in zip(cls.columns, spills):
+                    column = getattr(schedule, name)
+                    column.tofile(spill)
+                    del column[:]
+            columns = []
+            for name, spill in zip(cls.columns, spills):
+                spill.seek(0)
+                column = getattr(schedule, name)
+                columns.append((column.typecode, column.itemsize * games,
+                                functools.partial(shutil.copyfileobj, spill)))
+            schedule.writeFile(path, games, columns, extra)
+
+    @classmethod
+    def open(cls, path, mapped: bool = False) -> tuple['Schedule', dict]:
+        """Read a file written by :meth:`save`, through a memory map.
+
+        Returns the Schedule and the ``extra`` values.  Raises
+        :exc:`ValueError` if the file isn't a usable schedule.
+
+        With ``mapped``, the columns are read-only :class:`memoryview`
+        objects over the memory map instead of copies, so the games stay
+        on disk and are paged in as they're read.  Games can't be added
+        to a mapped Schedule.
+        """
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with contextlib.ExitStack() as stack:
+            if not mapped:
+                stack.enter_context(data)
+            if data[:len(cls.magic)] != cls.magic:
+                raise ValueError("Not a schedule file: {0}".format(path))
+            start = len(cls.magic) + 8
+            size = int.from_bytes(data[len(cls.magic):start], 'little')
+            try:
+                header = json.loads(data[start:start + size])
+                start += size
+                if header['byteorder'] != sys.byteorder:
+                    raise ValueError("Schedule file has the wrong byte order: {0}".format(path))
+                schedule = cls(names=header['names'], dates=header['dates'])
+                for name, typecode, offset, length in header['columns']:
+                    column = getattr(schedule, name)
+                    if column.typecode != typecode or column.itemsize * header['games'] != length:
+                        raise ValueError("Schedule file has the wrong layout: {0}".format(path))
+                    if mapped:
+                        setattr(schedule, name, memoryview(data)[
+                            start + offset:start + offset + length].cast(typecode))
+                    else:
+                        column.frombytes(data[start + offset:start + offset + length])
+            except (KeyError, TypeError) as error:
+                raise ValueError("Damaged schedule file: {0}".format(path)) from error
+        schedule.ids = {name: i for i, name in enumerate(schedule.names)}
+        schedule.date_ids = {date: i for i, date in enumerate(schedule.dates)}
+        return schedule, header.get('extra', {})
+
+    @classmethod
+    def fromGames(cls, games) -> 'Schedule':
+        """Build a Schedule from an iterable of :class:`Game` instances."""
+        schedule = cls()
+        for g in games:
+            schedule.add(g.date, g.team1, g.score1, g.team2, g.score2, g.game_ratio)
+        return schedule
+
+    def __len__(self):
+        return len(self.game_ratio)
+
+    def __getitem__(self, i):
+        names = self.names
+        return Game.fromColumns(self.dates[self.date[i]], names[self.team1[i]], self.score1[i],
+                                names[self.team2[i]], self.score2[i], self.game_ratio[i])
+
+    def __iter__(self):
+        names, dates = self.names, self.dates
+        for d, t1, s1, t2, s2, r in zip(self.date, self.team1, self.score1,
+                                         self.team2, self.score2, self.game_ratio):
+            yield Game.fromColumns(dates[d], names[t1], s1, names[t2], s2, r)
+
+    def totalPoints(self) -> int:
+        return sum(self.score1) + sum(self.score2)
+
+    def teamTable(self, chunk_size: int = 1 << 16) -> TeamTable:
+        """Accumulate each team's record and points into a :class:`TeamTable`:
+        overall, at home and as the visitor.  Team 2 is the home team.
+
+        With :mod:`numpy` this is one pass of whole-array operations over
+        ``chunk_size`` games at a time.
+        """
+        table = TeamTable(self.names)
+        if np is None:
+            for t1, s1, t2, s2 in zip(self.team1, self.score1, self.team2, self.score2):
+                table.updateStats(t1, s1, s2, False)
+                table.updateStats(t2, s2, s1, True)
+            return table
+        columns = [np.frombuffer(getattr(self, name), dtype=np.intc)
+                   for name in ('team1', 'score1', 'team2', 'score2')]
+        for first in range(0, len(self), chunk_size):
+            table.addSplits(*(column[first:first + chunk_size] for column in columns))
+        return table
+
+
+def asSchedule(schedule) -> Schedule:
+    """Accept either a :class:`Schedule` or a list of :class:`Game` instances."""
+    if isinstance(schedule, Schedule):
+        return schedule
+    return Schedule.fromGames(schedule)
+
+
+def expectedGameResult(rating1, rating2, x, home=0.0):
     '''The expectedGameResult method is used to determine an expected
     outcome of a game.
 
@@ -218,43 +826,109 @@ def expectedGameResult(rating1, rating2, x):
     :param:`rating1` Team 1's rating.
     :param:`rating2` Team 2's rating.
     :param:`x` the "K factor" weighting, default is 10.0
+    :param:`home` the home team's advantage, in rating points.  Team 2
+        is the home team.
     '''
-    expected_ratio = (1 / (1 + pow(10, (rating2 - rating1) / x)))
+    expected_ratio = (1 / (1 + pow(10, (rating2 + home - rating1) / x)))
     return expected_ratio
 
 
-def updateTeamRating(teamlist, kfactor):
-    for t in teamlist.values():
-        t.power = t.power + \
-            (kfactor *
-                (t.game_rate_accum / (t.won + t.lost + t.tied)))
+@dataclass(slots=True)
+class SolverResult:
+    """The outcome of a rating solve.
+
+    The residual is the largest change to any team's power that one more
+    fixed-step iteration would make: ``kfactor * game_rate_accum / games``.
 
+    ``sweeps`` counts every pass over the games, which is the solve's real
+    cost.  A fixed-step iteration is one sweep; a Newton iteration is
+    many, for its linear solve and line search.
+    """
+    iterations: int
+    residual: float
+    converged: bool
+    solver: str = 'fixed'
+    #: The home team's fitted advantage, if it was solved for.
+    home_advantage: float = 0.0
+    sweeps: int = 0
+
+
+@dataclass(slots=True)
+class IterationStats:
+    """Telemetry for one iteration of a solver, passed to its observer.
+
+    The residual is whatever the solver's stopping test checks: the
+    squared change in ``std_dev_ratio`` for the fixed-step solver, the
+    largest remaining step for Newton.  ``std_dev_ratio`` is None for
+    solvers that don't compute it.  ``elapsed`` is wall time in seconds
+    since the solve started.
+    """
+    iteration: int
+    residual: float
+    std_dev_ratio: float | None
+    max_change: float
+    elapsed: float
+
+
+def residualOf(teamlist, kfactor):
+    """The largest power change one more fixed-step iteration would make."""
+    return max((abs(kfactor * t.game_rate_accum / (t.won + t.lost + t.tied))
+                for t in teamlist.values()), default=0.0)
 
-def calcTeamRatings(teamlist, totalgames, schedule):
-    '''The calcTeamRatings method calculates each teams' power ratings.'''
-    kfactor = 10.0
+
+def updateTeamRating(teamlist, kfactor):
+    """Revise each team's power.  Returns the largest change."""
+    max_change = 0.0
+    for t in teamlist.values():
+        change = (kfactor *
+                  (t.game_rate_accum / (t.won + t.lost + t.tied)))
+        t.power = t.power + change
+        max_change = max(max_change, abs(change))
+    return max_change
+
+
+def calcTeamRatings(teamlist, totalgames, schedule, observer=None, kfactor=10.0,
+                    home_field=False):
+    '''The calcTeamRatings method calculates each teams' power ratings.
+
+    :param:`observer` is an optional callable; it's given an
+        :class:`IterationStats` after every iteration.
+    :param:`kfactor` is the rating difference that makes one team ten
+        times as likely as the other to win; see :func:`expectedGameResult`.
+    :param:`home_field` also solves for the home team's advantage, as if
+        the home side of every game were one more team.  Team 2 is the
+        home team.  The result's ``home_advantage`` is the fitted value.
+    '''
+    home = 0.0
     tolerance = 1e-9
     std_dev_ratio = 1.0
     max_iterations = 25000
     std_dev_ratio_diff = 100.0
     old_std_dev_ratio = 1.0
     iterations = 0
+    start = time.perf_counter()
+    schedule = asSchedule(schedule)
+    # Teams by id, so the inner loop doesn't hash names.
+    teams = [teamlist[name] for name in schedule.names]
+    games = list(zip(schedule.team1, schedule.team2, schedule.game_ratio))
     while ((std_dev_ratio_diff > tolerance) and (iterations < max_iterations)):
         old_std_dev_ratio = std_dev_ratio
         total_game_rate_accum = 0.0
+        home_accum = 0.0
         for t in teamlist.values():
             t.game_rate_accum = 0.0
-        for g in schedule:
-            team1_game_rating = teamlist[g.team1].game_rate_accum
-            team1_rating = teamlist[g.team1].power
-            team2_game_rating = teamlist[g.team2].game_rate_accum
-            team2_rating = teamlist[g.team2].power
-            team1_game_rating = team1_game_rating + g.game_ratio - \
-                expectedGameResult(team1_rating, team2_rating, kfactor)
-            team2_game_rating = team2_game_rating + 1 - g.game_ratio - \
-                (1 - expectedGameResult(team1_rating, team2_rating, kfactor))
-            teamlist[g.team1].game_rate_accum = team1_game_rating
-            teamlist[g.team2].game_rate_accum = team2_game_rating
+        for t1, t2, game_ratio in games:
+            team1, team2 = teams[t1], teams[t2]
+            team1_game_rating = team1.game_rate_accum
+            team1_rating = team1.power
+            team2_game_rating = team2.game_rate_accum
+            team2_rating = team2.power
+            expected = expectedGameResult(team1_rating, team2_rating, kfactor, home)
+            team1_game_rating = team1_game_rating + game_ratio - expected
+            team2_game_rating = team2_game_rating + 1 - game_ratio - (1 - expected)
+            home_accum = home_accum + expected - game_ratio
+            team1.game_rate_accum = team1_game_rating
+            team2.game_rate_accum = team2_game_rating
             if team1_game_rating > team2_game_rating:
                 total_game_rate_accum = total_game_rate_accum + team1_game_rating
             else:
@@ -265,11 +939,535 @@ def calcTeamRatings(teamlist, totalgames, schedule):
         std_dev_ratio_diff = (old_std_dev_ratio - std_dev_ratio) ** 2
         iterations = iterations + 1
         # Revise ratings
-        updateTeamRating(teamlist, kfactor)
-    if (iterations > max_iterations):
-        print("Fatal error: Game ratios aren't converging")
+        max_change = updateTeamRating(teamlist, kfactor)
+        if home_field:
+            home = home + kfactor * home_accum / totalgames
+        if observer:
+            observer(IterationStats(iterations, std_dev_ratio_diff, std_dev_ratio,
+                                    max_change, time.perf_counter() - start))
+    residual = residualOf(teamlist, kfactor)
+    if home_field:
+        residual = max(residual, abs(kfactor * home_accum / totalgames))
+    return SolverResult(iterations, residual, std_dev_ratio_diff <= tolerance,
+                        home_advantage=home, sweeps=iterations)
+
+
+def calcTeamRatingsArray(teamlist, totalgames, schedule, observer=None, kfactor=10.0,
+                         home_field=False):
+    '''The calcTeamRatingsArray method calculates each teams' power ratings
+    using whole-array operations.
+
+    This is the same model as :func:`calcTeamRatings`, but each iteration
+    is computed over vectors of team indexes instead of one game at a time.
+    It requires :mod:`numpy`.  The :param:`observer`, :param:`kfactor` and
+    :param:`home_field` are the same as for :func:`calcTeamRatings`.
+
+    It's :func:`calcTeamRatingsChunked` with the whole schedule as one
+    chunk, so the grouping of games by team is computed only once.
+    '''
+    return calcTeamRatingsChunked(teamlist, totalgames, schedule, observer, kfactor,
+                                  home_field, chunk_size=max(len(asSchedule(schedule)), 1))
+
+
+def chunkGroups(team1, team2):
+    """Group one chunk's game contributions by team.
+
+    Each game contributes to team1 then team2, in schedule order.
+    Returns the interleaved team of each contribution, the stable order
+    that groups them by team, the sorted teams, and for each sorted
+    contribution the position where its team's group starts.
+    """
+    teams = np.empty(2 * len(team1), dtype=np.intp)
+    teams[0::2] = team1
+    teams[1::2] = team2
+    order = np.argsort(teams, kind='stable')
+    sorted_teams = teams[order]
+    starts = np.flatnonzero(np.r_[True, sorted_teams[1:] != sorted_teams[:-1]])
+    segment_start = np.repeat(starts, np.diff(np.r_[starts, len(teams)]))
+    return teams, order, sorted_teams, segment_start
+
+
+def calcTeamRatingsChunked(teamlist, totalgames, schedule, observer=None, kfactor=10.0,
+                           home_field=False, chunk_size=1 << 16):
+    '''The calcTeamRatingsChunked method calculates each teams' power
+    ratings while streaming over the schedule in chunks.
+
+    This is the computation of :func:`calcTeamRatings` with whole-array
+    operations, but only ``chunk_size`` games are turned into arrays at a
+    time, and the running ``game_rate_accum`` of each team is carried from
+    one chunk to the next.  Apart from the chunk, memory use depends only
+    on the number of teams, so with a schedule from ``Schedule.open(path,
+    mapped=True)`` the games never have to fit in memory.  It requires
+    :mod:`numpy`.  The :param:`observer`, :param:`kfactor` and
+    :param:`home_field` are the same as for :func:`calcTeamRatings`.
+
+    The stopping rule depends on the running ``game_rate_accum`` of each
+    team *as the schedule is read in order*.  That running value is
+    reproduced with a segmented cumulative sum over the game contributions,
+    grouped by team with a stable sort; see :func:`chunkGroups`.  When the
+    schedule is a single chunk, the grouping is computed once.
+    '''
+    if np is None:
+        raise RuntimeError("The numpy and chunked engines require the numpy package")
+    tolerance = 1e-9
+    std_dev_ratio = 1.0
+    max_iterations = 25000
+    std_dev_ratio_diff = 100.0
+    old_std_dev_ratio = 1.0
+    iterations = 0
+    start = time.perf_counter()
+
+    schedule = asSchedule(schedule)
+    names = schedule.names
+    size = len(names)
+    # Views of the columns, not copies; each chunk is copied as it's used.
+    all_team1 = np.frombuffer(schedule.team1, dtype=np.intc)
+    all_team2 = np.frombuffer(schedule.team2, dtype=np.intc)
+    all_game_ratio = np.frombuffer(schedule.game_ratio, dtype=float)
+    power = np.fromiter((teamlist[n].power for n in names), dtype=float, count=size)
+    games = np.fromiter((teamlist[n].won + teamlist[n].lost + teamlist[n].tied for n in names),
+                        dtype=float, count=size)
+    game_rate_accum = np.zeros(size)
+    home = home_accum = 0.0
+
+    def chunks():
+        for first in range(0, len(schedule), chunk_size):
+            team1 = all_team1[first:first + chunk_size].astype(np.intp)
+            team2 = all_team2[first:first + chunk_size].astype(np.intp)
+            yield (team1, team2, all_game_ratio[first:first + chunk_size],
+                   chunkGroups(team1, team2))
+
+    whole = list(chunks()) if len(schedule) <= chunk_size else None
+
+    while ((std_dev_ratio_diff > tolerance) and (iterations < max_iterations)):
+        old_std_dev_ratio = std_dev_ratio
+        total_game_rate_accum = 0.0
+        home_accum = 0.0
+        game_rate_accum = np.zeros(size)
+        for team1, team2, game_ratio, (teams, order, sorted_teams, segment_start) in (
+                whole if whole is not None else chunks()):
+            expected = 1 / (1 + np.power(10, (power[team2] + home - power[team1]) / kfactor))
+            if home_field:
+                home_accum += float((expected - game_ratio).sum())
+            contrib = np.empty(len(teams))
+            contrib[0::2] = game_ratio - expected
+            contrib[1::2] = 1 - game_ratio - (1 - expected)
+            # Running game_rate_accum of each team after each of its games
+            # in this chunk, on top of its total from the earlier chunks.
+            ordered = contrib[order]
+            cumulative = np.cumsum(ordered)
+            running = np.empty(len(teams))
+            running[order] = (cumulative - (cumulative[segment_start] - ordered[segment_start])
+                              + game_rate_accum[sorted_teams])
+            total_game_rate_accum += np.maximum(running[0::2], running[1::2]).sum()
+            game_rate_accum += np.bincount(teams, weights=contrib, minlength=size)
+        # Calculate grate standard deviation
+        std_dev_ratio = math.sqrt(((
+            total_game_rate_accum ** 2) / totalgames))
+        std_dev_ratio_diff = (old_std_dev_ratio - std_dev_ratio) ** 2
+        iterations = iterations + 1
+        # Revise ratings
+        change = kfactor * (game_rate_accum / games)
+        power += change
+        home = home + kfactor * home_accum / totalgames
+        if observer:
+            observer(IterationStats(iterations, std_dev_ratio_diff, std_dev_ratio,
+                                    float(np.abs(change).max(initial=0.0)),
+                                    time.perf_counter() - start))
+
+    storeArrays(teamlist, names, power, game_rate_accum)
+    residual = max(float(np.abs(kfactor * game_rate_accum / games).max(initial=0.0)),
+                   abs(kfactor * home_accum / totalgames))
+    return SolverResult(iterations, residual, std_dev_ratio_diff <= tolerance,
+                        home_advantage=home, sweeps=iterations)
+
+
+def scheduleArrays(teamlist, schedule):
+    """Return the arrays used by the array-backed solvers, indexed by
+    the team ids of the :class:`Schedule`.
+
+    Returns the list of team names, the team1 and team2 index vectors,
+    the game ratios, the current power ratings and the number of games
+    each team played.
+    """
+    if np is None:
+        raise RuntimeError("The numpy engine requires the numpy package")
+    schedule = asSchedule(schedule)
+    names = schedule.names
+    team1 = np.frombuffer(schedule.team1, dtype=np.intc).astype(np.intp)
+    team2 = np.frombuffer(schedule.team2, dtype=np.intc).astype(np.intp)
+    game_ratio = np.frombuffer(schedule.game_ratio, dtype=float)
+    power = np.fromiter((teamlist[n].power for n in names), dtype=float, count=len(names))
+    games = np.fromiter((teamlist[n].won + teamlist[n].lost + teamlist[n].tied for n in names),
+                        dtype=float, count=len(names))
+    return names, team1, team2, game_ratio, power, games
+
+
+def storeArrays(teamlist, names, power, game_rate_accum):
+    """Copy solved ratings from the arrays back onto the Team objects."""
+    for name, p, a in zip(names, power.tolist(), game_rate_accum.tolist()):
+        teamlist[name].power = p
+        teamlist[name].game_rate_accum = a
+
+
+def componentLabels(team1, team2, size):
+    """Label each team with the connected component of the schedule
+    it belongs to.  Two teams are connected if a chain of games joins them.
+    """
+    parent = list(range(size))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in zip(team1, team2):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return [find(i) for i in range(size)]
+
+
+def laplacianSolve(team1, team2, weight, rhs, tolerance=1e-10, max_iterations=None,
+                   home_field=False):
+    """Solve ``L x = rhs`` where ``L`` is the schedule's graph Laplacian
+    with one edge of the given weight per game.
+
+    This is a Jacobi-preconditioned conjugate gradient; it only needs
+    products with ``L``, which are two :func:`numpy.bincount` calls, so
+    the cost is linear in the number of games.  ``L`` is singular (adding
+    a constant to a connected group of teams changes nothing), so ``rhs``
+    must sum to zero over each connected component.
+
+    With :param:`home_field`, the last entry of ``rhs`` and ``x`` is the
+    home advantage, which every game's edge is offset by, so ``L`` gets
+    one more row and column: the home term's couplings to each team and
+    the total weight in the corner.  The products still take one pass.
+
+    Returns ``x`` and the number of passes over the games it took.
+    """
+    size = len(rhs) - 1 if home_field else len(rhs)
+
+    def product(v):
+        diff = weight * (v[team1] - v[team2] - (v[size] if home_field else 0.0))
+        lv = np.bincount(team1, diff, size) - np.bincount(team2, diff, size)
+        return np.append(lv, -diff.sum()) if home_field else lv
+
+    diag = np.bincount(team1, weight, size) + np.bincount(team2, weight, size)
+    if home_field:
+        diag = np.append(diag, weight.sum())
+    inverse_diag = 1.0 / np.maximum(diag, 1e-300)
+    sweeps = 1
+    x = np.zeros(len(rhs))
+    r = rhs.copy()
+    z = r * inverse_diag
+    d = z.copy()
+    rz = r @ z
+    # Rounding error drifts along the null space once the residual is
+    # tiny, so there is an absolute floor as well as a relative tolerance.
+    limit = max(tolerance * np.abs(rhs).max(initial=0.0), 1e-14)
+    for _ in range(max_iterations or size + 10):
+        if np.abs(r).max(initial=0.0) <= limit:
+            break
+        ld = product(d)
+        sweeps += 1
+        curvature = d @ ld
+        if curvature <= 0.0:
+            break
+        step = rz / curvature
+        trial = x + step * d
+        if not np.isfinite(trial).all():
+            # A team whose games are all but decided carries almost no
+            # weight; keep the last finite iterate rather than overflow.
+            break
+        x = trial
+        r -= step * ld
+        z = r * inverse_diag
+        rz, rz_old = r @ z, rz
+        d = z + (rz / rz_old) * d
+    return x, sweeps
+
+
+def calcTeamRatingsNewton(teamlist, totalgames, schedule, observer=None, kfactor=10.0,
+                          home_field=False):
+    '''The calcTeamRatingsNewton method calculates each teams' power ratings
+    by solving for the fixed point of :func:`calcTeamRatings` directly.
+
+    At the fixed point every team's ``game_rate_accum`` is zero: its actual
+    game ratios add up to its expected results.  Each Newton step solves the
+    linearized system with :func:`laplacianSolve`, with a backtracking line
+    search so a step never makes the residual worse.
+
+    Adding a constant to every team in a connected group of teams does
+    not change the expected results, so the fixed point is only defined up
+    to that constant.  The fixed-step iteration preserves the games-weighted
+    sum of the ratings in each group; this solver holds the same sums, so
+    it lands on the same ratings.  It requires :mod:`numpy`.  The
+    :param:`observer`, :param:`kfactor` and :param:`home_field` are the
+    same as for :func:`calcTeamRatings`.  With :param:`home_field`, the
+    home advantage is one more unknown in the same linear system, so each
+    Newton step updates it and the ratings together.
+
+    A team whose game ratios add up to at least its number of games (a
+    blowout win as team 1 scores over 1) has no finite fixed point: no
+    rating makes its expected results catch up.  See :func:`unboundedTeams`.
+    Its games are left out of the system, so the other teams still
+    converge, and it's then rated the step cap ahead of the best team it
+    played.
+    '''
+    tolerance = 1e-9
+    max_iterations = 100
+    max_step = 5 * kfactor
+    slope = math.log(10) / kfactor
+
+    names, team1, team2, game_ratio, power, games = scheduleArrays(teamlist, schedule)
+    size = len(names)
+    unbounded, keep = unboundedTeams(team1, team2, game_ratio, size)
+    if unbounded.any():
+        all_team1, all_team2 = team1, team2
+        team1, team2, game_ratio = team1[keep], team2[keep], game_ratio[keep]
+        games = np.maximum(np.bincount(team1, minlength=size) + np.bincount(team2, minlength=size), 1)
+        totalgames = max(len(team1), 1)
+    component = np.array(componentLabels(team1.tolist(), team2.tolist(), size), dtype=np.intp)
+    component_games = np.bincount(component, games, size)
+
+    def gameRateAccum(power, home):
+        nonlocal sweeps
+        sweeps += 1
+        expected = 1 / (1 + np.power(10, (power[team2] + home - power[team1]) / kfactor))
+        delta = game_ratio - expected
+        accum = np.bincount(team1, delta, size) - np.bincount(team2, delta, size)
+        home_accum = -float(delta.sum()) if home_field else 0.0
+        return accum, expected, home_accum
+
+    def largestStep(accum, home_accum):
+        return max(float(np.abs(kfactor * accum / games).max(initial=0.0)),
+                   abs(kfactor * home_accum / totalgames))
+
+    start = time.perf_counter()
+    home = 0.0
+    sweeps = 0
+    game_rate_accum, expected, home_accum = gameRateAccum(power, home)
+    residual = largestStep(game_rate_accum, home_accum)
+    iterations = 0
+    while residual > tolerance and iterations < max_iterations:
+        iterations = iterations + 1
+        weight = slope * expected * (1 - expected)
+        if home_field:
+            solution, solve_sweeps = laplacianSolve(team1, team2, weight,
+                                                    np.append(game_rate_accum, home_accum),
+                                                    home_field=True)
+            step, home_step = solution[:size], float(solution[size])
+        else:
+            step, solve_sweeps = laplacianSolve(team1, team2, weight, game_rate_accum)
+            home_step = 0.0
+        sweeps += solve_sweeps
+        # Hold the games-weighted sum of each connected group fixed.
+        step -= (np.bincount(component, games * step, size) / np.maximum(component_games, 1))[component]
+        # Cap the step, so a first step from far out can't overshoot.
+        largest = max(np.abs(step).max(initial=0.0), abs(home_step))
+        if largest > max_step:
+            step *= max_step / largest
+            home_step *= max_step / largest
+        norm = np.abs(game_rate_accum).sum() + abs(home_accum)
+        scale = 1.0
+        while scale >= 1e-6:
+            trial, trial_home = power + scale * step, home + scale * home_step
+            trial_accum, trial_expected, trial_home_accum = gameRateAccum(trial, trial_home)
+            trial_norm = np.abs(trial_accum).sum() + abs(trial_home_accum)
+            if trial_norm < norm:
+                break
+            scale = scale / 2
+        else:
+            break
+        power, game_rate_accum, expected = trial, trial_accum, trial_expected
+        home, home_accum = trial_home, trial_home_accum
+        residual = largestStep(game_rate_accum, home_accum)
+        if observer:
+            observer(IterationStats(iterations, residual, None,
+                                    float(np.abs(scale * step).max(initial=0.0)),
+                                    time.perf_counter() - start))
+        if trial_norm > (1 - 1e-6) * norm:
+            # Stalled: the residual that remains belongs to ratings that
+            # have no finite fixed point.
+            break
+
+    for team in np.flatnonzero(unbounded):
+        opponents = np.r_[all_team2[all_team1 == team], all_team1[all_team2 == team]]
+        opponents = opponents[~unbounded[opponents]]
+        if len(opponents):
+            power[team] = power[opponents].max() + max_step
+    storeArrays(teamlist, names, power, game_rate_accum)
+    return SolverResult(iterations, residual, residual <= tolerance, 'newton', home, sweeps)
+
+
+def unboundedTeams(team1, team2, game_ratio, size):
+    """Find the teams with no finite rating, for :func:`calcTeamRatingsNewton`.
+
+    A team's expected results are always less than its number of games,
+    so a team whose game ratios add up to at least that many can never
+    be matched.  Once its games are left out, another team may be left
+    in the same position, so this repeats until none is.
+
+    Returns a mask of the unbounded teams and a mask of the games that
+    don't involve them.
+    """
+    unbounded = np.zeros(size, dtype=bool)
+    keep = np.ones(len(team1), dtype=bool)
+    while True:
+        kept1, kept2, ratio = team1[keep], team2[keep], game_ratio[keep]
+        played = np.bincount(kept1, minlength=size) + np.bincount(kept2, minlength=size)
+        actual = np.bincount(kept1, ratio, size) + np.bincount(kept2, 1 - ratio, size)
+        found = (played > 0) & (actual >= played)
+        if not found.any():
+            return unbounded, keep
+        unbounded |= found
+        keep &= ~(found[team1] | found[team2])
+
+
+# Rating engines for the fixed-step solver, selected with the ``engine``
+# keyword of :func:`load`.
+ENGINES = {
+    'python': calcTeamRatings,
+    'numpy': calcTeamRatingsArray,
+    'chunked': calcTeamRatingsChunked,
+}
+
+# Solvers, selected with the ``solver`` keyword of :func:`load`.
+# The fixed-step solver uses the chosen engine; the others are array-backed.
+SOLVERS = {
+    'fixed': None,
+    'newton': calcTeamRatingsNewton,
+}
+
+
+def solverFor(engine: str = 'python', solver: str = 'fixed', home_field: bool = False):
+    """The rating function for an engine and solver name, as selected
+    on the command line, with the home-field term if it's wanted."""
+    calc = SOLVERS[solver] or ENGINES[engine]
+    return functools.partial(calc, home_field=True) if home_field else calc
+
+
+def printSolverResult(result):
+    if result.converged and result.solver == 'newton':
+        print('The scores were examined {} times in {} Newton steps (residual {:.3g}).'
+              .format(result.sweeps, result.iterations, result.residual))
+    elif result.converged:
+        print('The scores were examined {} times (residual {:.3g}).'
+              .format(result.iterations, result.residual))
     else:
-        print('The scores were examined {} times.'.format(iterations))
+        print("Fatal error: Game ratios aren't converging after {} iterations (residual {:.3g})"
+              .format(result.iterations, result.residual))
+    if result.home_advantage:
+        print('The home team is worth {:.3f} rating points.'.format(result.home_advantage))
+
+
+def solveComponent(calc, teamlist, schedule, observer=None):
+    """Solve one connected group of teams.  This is the unit of work
+    for :func:`calcComponentRatings`."""
+    return teamlist, calc(teamlist, len(schedule), schedule, observer)
+
+
+def calcComponentRatings(teamlist, schedule, calc, groups=None, jobs=1, observer=None):
+    """Solve each connected group of teams on its own.
+
+    Groups that never play each other are independent systems, so each
+    converges separately and an already-settled group isn't recomputed
+    while a slower one finishes.  With ``jobs`` greater than 1 the groups
+    are solved in a process pool; the observer is only used when
+    solving in this process.
+
+    :param:`calc` is one of the solvers in :data:`ENGINES` or :data:`SOLVERS`.
+    :param:`groups` is the result of :meth:`Schedule.components`, if it's
+        already been computed.
+
+    Returns a :class:`SolverResult` that combines the groups: the most
+    iterations and sweeps, the largest residual, and converged only if
+    every group converged.
+    """
+    schedule = asSchedule(schedule)
+    parts = [schedule.subset(games) for games in (groups or schedule.components())]
+    work = [{name: teamlist[name] for name in part.names} for part in parts]
+    if jobs > 1 and len(parts) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            solved = list(pool.map(solveComponent, itertools.repeat(calc), work, parts,
+                                   chunksize=max(1, len(parts) // (4 * jobs))))
+    else:
+        solved = [solveComponent(calc, teams, part, observer) for teams, part in zip(work, parts)]
+    results = []
+    for teams, result in solved:
+        for name, team in teams.items():
+            teamlist[name].power = team.power
+            teamlist[name].game_rate_accum = team.game_rate_accum
+        results.append(result)
+    return SolverResult(max((r.iterations for r in results), default=0),
+                        max((r.residual for r in results), default=0.0),
+                        all(r.converged for r in results),
+                        results[0].solver if results else 'fixed',
+                        sweeps=max((r.sweeps for r in results), default=0))
+
+
+def printComponentWarning(labels):
+    """Warn that the ratings of disconnected groups of teams can't be
+    compared.  ``labels`` are the team labels from :func:`componentLabels`."""
+    counts = {}
+    for label in labels:
+        counts[label] = counts.get(label, 0) + 1
+    if len(counts) < 2:
+        return
+    sizes = sorted(counts.values(), reverse=True)
+    print('Warning: the schedule has {0} groups of teams that never play each other. '
+          'Ratings can only be compared within a group.'.format(len(sizes)))
+    shown = ', '.join(str(size) for size in sizes[:10])
+    print('Teams per group: {0}{1}'.format(shown, ', ...' if len(sizes) > 10 else ''))
+
+
+class Profile:
+    """Wall time spent in each phase of a run, plus solver telemetry.
+
+    A Profile is also a solver observer: give it to :func:`load` and it
+    records the iterations.  :meth:`summary` is a JSON-ready dict.
+    """
+
+    def __init__(self, **details):
+        self.details = details
+        self.phases = {}
+        self.iterations = 0
+        self.last = None
+        self.result = None
+
+    def __call__(self, stats: IterationStats) -> None:
+        self.iterations += 1
+        self.last = stats
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Add the time spent in the ``with`` block to phase ``name``."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self):
+        summary = dict(self.details, phases=self.phases)
+        if self.result:
+            summary['solver'] = {
+                'solver': self.result.solver,
+                'iterations': self.result.iterations,
+                'sweeps': self.result.sweeps,
+                'residual': self.result.residual,
+                'converged': self.result.converged,
+                'seconds_per_iteration':
+                    self.last.elapsed / self.last.iteration if self.last else None,
+            }
+        return summary
+
+
+def phase(profile, name):
+    """Time a phase if there's a :class:`Profile`; otherwise do nothing."""
+    return profile.phase(name) if profile else contextlib.nullcontext()
 
 
 def printSummary(total_games, total_points):
@@ -285,57 +1483,117 @@ def sortDictByPower(teamlist):
     return sorted_list
 
 
+#: The formats :func:`printRankings` can write.
+REPORT_FORMATS = ('text', 'csv', 'jsonl')
+
+
 def printRankings(args, teamlist):
-    '''The printRankings method returns the calculated rankings in text format and also saves to a CSV file'''
-    fmt = "{0.name:40s} {0.won:4d} {0.lost:5d} {0.tied:5d} " + \
-          "{0.pf:5d} {0.pa:5d} {0.power:8.3f}"
+    '''The printRankings method writes the calculated rankings in each of
+    the formats in ``args.formats``: a text table (to ``--output`` or the
+    console), CSV and JSON Lines.
+
+    All the formats are written in a single pass over the sorted teams.
+    '''
+    formats = args.formats or ('text', 'csv')
+    fmt = "{0:4d} {1:40s} {2.won:4d} {2.lost:5d} {2.tied:5d} " + \
+          "{2.pf:5d} {2.pa:5d} {2.power:8.3f}\n"
     sorted_list = sortDictByPower(teamlist.values())
 
-    for t in sorted_list:
-        t.name = t.name.upper()
+    # Name the files using Pathlib
+    output_path = Path(args.output) if args.output else None
+    base_path = output_path or Path(args.csv_output or 'rankings.csv')
+    exported = []
 
-    # Export in text format using Pathlib
-    if args.output:
-        output_path = Path(args.output)
-        with output_path.open('w') as f:
-            f.write('{:>4s} {:>40s} {:>4s} {:>5s} {:>5s} {:>5s} {:>5s} {:>8s}'
-                    .format('Rank', '', 'Won', 'Lost', 'Tied', 'PF', 'PA', 'Rating'))
-            f.write('\n')
-            for team in sorted_list:
-                f.write('{0:4d}'.format(sorted_list.index(team) + 1) + ' ' +
-                        fmt.format(team) + '\n')
-    else:
-        # Print to console in text format
-        print('{:>4s} {:>40s} {:>4s} {:>5s} {:>5s} {:>5s} {:>5s} {:>8s}'
-              .format('Rank', '', 'Won', 'Lost', 'Tied', 'PF', 'PA', 'Rating')
-              )
-        for team in sorted_list:
-            print('{0:4d}'.format(sorted_list.index(team) + 1) + ' ' +
-                  fmt.format(team))
-
-    # Automatically create CSV filename based on output filename using Pathlib
-    csv_filename = output_path.with_suffix('.csv') if args.output else Path('rankings.csv')
-    with csv_filename.open('w', newline='') as csvfile:
-        fieldnames = ['Rank', 'Team', 'Won', 'Lost', 'Tied', 'PF', 'PA', 'Rating']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for rank, team in enumerate(sorted_list, start=1):
-            writer.writerow({
-                'Rank': rank,
-                'Team': team.name,
-                'Won': team.won,
-                'Lost': team.lost,
-                'Tied': team.tied,
-                'PF': team.pf,
-                'PA': team.pa,
-                'Rating': f"{team.power:.3f}"
-            })
+    with contextlib.ExitStack() as stack:
+        text = csv_writer = jsonl = None
+        if 'text' in formats:
+            if output_path:
+                text = stack.enter_context(output_path.open('w', buffering=1 << 16))
+            else:
+                # Print to console in text format
+                text = sys.stdout
+            text.write('{:>4s} {:>40s} {:>4s} {:>5s} {:>5s} {:>5s} {:>5s} {:>8s}\n'
+                       .format('Rank', '', 'Won', 'Lost', 'Tied', 'PF', 'PA', 'Rating'))
+        if 'csv' in formats:
+            csv_filename = base_path.with_suffix('.csv')
+            csvfile = stack.enter_context(csv_filename.open('w', newline='', buffering=1 << 16))
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(['Rank', 'Team', 'Won', 'Lost', 'Tied', 'PF', 'PA', 'Rating'])
+            exported.append(csv_filename)
+        if 'jsonl' in formats:
+            jsonl_filename = base_path.with_suffix('.jsonl')
+            jsonl = stack.enter_context(jsonl_filename.open('w', buffering=1 << 16))
+            exported.append(jsonl_filename)
 
-    print(f"Rankings have been exported to {csv_filename} as well.")
+        for rank, team in enumerate(sorted_list, start=1):
+            name = team.name.upper()
+            if text:
+                text.write(fmt.format(rank, name, team))
+            if csv_writer:
+                csv_writer.writerow([rank, name, team.won, team.lost, team.tied,
+                                     team.pf, team.pa, f"{team.power:.3f}"])
+            if jsonl:
+                jsonl.write(json.dumps({
+                    'rank': rank, 'team': name, 'won': team.won, 'lost': team.lost,
+                    'tied': team.tied, 'pf': team.pf, 'pa': team.pa,
+                    'home': splitRecord(team, 'h'), 'visitor': splitRecord(team, 'v'),
+                    'power': team.power}) + '\n')
+
+    for filename in exported:
+        print(f"Rankings have been exported to {filename} as well.")
+
+
+def splitRecord(team: Team, prefix: str) -> dict[str, int]:
+    """A team's home (``'h'``) or visitor (``'v'``) record, for reports."""
+    return {name: getattr(team, prefix + name) for name in ('won', 'lost', 'tied', 'pf', 'pa')}
+
+
+# Magic bytes of the compressed formats a history file may be in.
+COMPRESSION = (
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+)
+
+
+@contextlib.contextmanager
+def openHistory(path):
+    """Open a history file as text.
+
+    A gzip, bz2 or xz file, recognized by its first bytes rather than its
+    name, is decompressed as it's read.  A path of ``-`` is standard
+    input, which may be compressed too; it's left open afterwards.
+    """
+    with contextlib.ExitStack() as stack:
+        if str(path) == '-':
+            binary = sys.stdin.buffer
+        else:
+            binary = stack.enter_context(open(path, 'rb'))
+        magic = binary.peek(8)
+        for prefix, opener in COMPRESSION:
+            if magic.startswith(prefix):
+                binary = stack.enter_context(opener(binary))
+                break
+        text = io.TextIOWrapper(binary)
+        try:
+            yield text
+        finally:
+            # Leave closing the files to the stack; stdin stays open.
+            text.detach()
 
 
 class HistoryReader:
-    """Abstract superclass for History readers."""
+    """Abstract superclass for History readers.
+
+    Subclasses either yield History instances from :meth:`__iter__`, or
+    yield positional rows of strings from :meth:`rows`:
+    ``(date, team1, score1, team2, score2)``.  The :meth:`schedule` method
+    parses rows straight into a :class:`Schedule`, which is how
+    :func:`load` reads a file.
+    """
+
+    #: Characters read from the source at a time.
+    block_size = 1 << 20
 
     def __init__(self, source):
         self.source = source
@@ -344,6 +1602,39 @@ class HistoryReader:
         """Yield History instances from the source."""
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def lines(self):
+        """Yield the lines of the source, reading it in large blocks."""
+        read = self.source.read
+        tail = ''
+        while block := read(self.block_size):
+            lines = (tail + block).split('\n')
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
+
+    def rows(self):
+        """Yield ``(date, team1, score1, team2, score2)`` tuples."""
+        for h in self:
+            yield h.date, h.team1, h.score1, h.team2, h.score2
+
+    def schedule(self, sport: SportFactor) -> Schedule:
+        """Parse the whole source into a :class:`Schedule`."""
+        schedule = Schedule()
+        schedule.extend(self.rows(), sport)
+        return schedule
+
+    @classmethod
+    def readRows(cls, paths):
+        """Yield the :meth:`rows` of each file in turn, as one season.
+
+        Each file is opened with :func:`openHistory` only when the
+        previous one is finished, and read as a stream.
+        """
+        for path in paths:
+            with openHistory(path) as source:
+                yield from cls(source).rows()
+
 
 class CSVHistoryReader(HistoryReader):
 
@@ -352,14 +1643,32 @@ class CSVHistoryReader(HistoryReader):
 
     Column names must include: 'date', 'team1', 'score1', 'team2', 'score2'
     in any order.
-    """
-    def __init__(self, source):
-        super().__init__(source)
-        self.reader = csv.DictReader(self.source)
 
+    Lines are split on commas directly; only lines with a quote
+    character go through the :mod:`csv` module.
+    """
     def __iter__(self):
-        for row in self.reader:
-            yield History(**row)
+        for row in self.rows():
+            yield History(*row)
+
+    def rows(self):
+        lines = self.lines()
+        header = next(csv.reader([next(lines, '')]), [])
+        try:
+            columns = [header.index(name) for name in History.__match_args__]
+        except ValueError:
+            raise ValueError("CSV columns must include {0}, found {1}"
+                             .format(', '.join(History.__match_args__), header)) from None
+        date, team1, score1, team2, score2 = columns
+        width = max(columns) + 1
+        for line in lines:
+            line = line.rstrip('\r')
+            if not line:
+                continue
+            fields = next(csv.reader([line])) if '"' in line else line.split(',')
+            if len(fields) < width:
+                raise ValueError("Too few columns: {0!r}".format(line))
+            yield fields[date], fields[team1], fields[score1], fields[team2], fields[score2]
 
 
 class PipeFormatHistoryReader(HistoryReader):
@@ -371,67 +1680,822 @@ class PipeFormatHistoryReader(HistoryReader):
 
     Specifically: 'date', 'team1', 'score1', 'team2', 'score2'.
     """
-    def __init__(self, source):
+    def __iter__(self):
+        for row in self.rows():
+            yield History(*row)
+
+    def rows(self):
+        for line in self.lines():
+            line = line.rstrip('\r')
+            if not line:
+                continue
+            fields = line.split('|', 5)
+            if len(fields) < 5:
+                raise ValueError("Expected 5 fields: {0!r}".format(line))
+            yield fields[0], fields[1], fields[2], fields[3], fields[4]
+
+
+def readerClass(format: str | None) -> type[HistoryReader]:
+    """The :class:`HistoryReader` for a "-d" option: CSV by default,
+    ``|`` for pipe-delimited."""
+    match format:
+        case None:
+            return CSVHistoryReader
+        case '|':
+            return PipeFormatHistoryReader
+        case _:
+            raise Exception("Unknown -d {0}".format(format))
+
+
+class MatchupReader(HistoryReader):
+
+    """Read upcoming games: ``(date, team1, team2)`` rows.
+
+    With ``delimiter='|'`` the columns are positional: date, team1, team2.
+    Otherwise the file is CSV with column titles, which must include
+    'team1' and 'team2'; 'date' is optional.
+    """
+    def __init__(self, source, delimiter=None):
         super().__init__(source)
-        self.reader = csv.DictReader(source, delimiter='|',
-                                     fieldnames=['date', 'team1', 'score1','team2', 'score2'])
+        self.delimiter = delimiter
 
     def __iter__(self):
-        for row in self.reader:
-            yield History(**row)
+        return self.rows()
+
+    def rows(self):
+        lines = self.lines()
+        if self.delimiter == '|':
+            for line in lines:
+                line = line.rstrip('\r')
+                if line:
+                    fields = line.split('|')
+                    if len(fields) < 3:
+                        raise ValueError("Expected 3 fields: {0!r}".format(line))
+                    yield fields[0], fields[1], fields[2]
+            return
+        reader = csv.reader(line.rstrip('\r') for line in lines)
+        header = next(reader, [])
+        try:
+            team1, team2 = header.index('team1'), header.index('team2')
+        except ValueError:
+            raise ValueError("CSV columns must include team1, team2, found {0}"
+                             .format(header)) from None
+        date = header.index('date') if 'date' in header else None
+        for fields in reader:
+            if fields:
+                yield (fields[date] if date is not None else ''), fields[team1], fields[team2]
+
+
+# Date formats recognized when matching games from different feeds.
+DATE_FORMATS = ('%Y%m%d', '%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%m/%d/%y',
+                '%d %b %Y', '%b %d, %Y', '%B %d, %Y')
+
+
+def normalizeDate(text) -> str:
+    """The ISO form of a date in one of :data:`DATE_FORMATS`, or the
+    text itself, stripped, if it isn't in any of them."""
+    text = text.strip()
+    for pattern in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, pattern).date().isoformat()
+        except ValueError:
+            pass
+    return text
 
 
-def load(source: HistoryReader, sport: Callable[[int, int], float]) -> tuple[int, int, dict[str, Team]]:
-    """Load the TeamList and some totals.
+@dataclass(slots=True)
+class MergeStats:
+    """Counts from a :class:`GameMerger`."""
+    rows: int = 0
+    games: int = 0
+    duplicates: int = 0
+    conflicts: int = 0
+
+
+class GameMerger:
+
+    """Find games that appear more than once in merged score feeds.
+
+    Each game is keyed on its date, in ISO form whatever format it's
+    written in, its two casefolded team names in either order, and the
+    scores that go with them.  A game whose date and teams match an
+    earlier game is a duplicate if the scores match too, and a conflict
+    if they don't.  The index maps the date and teams to the scores
+    seen first, as small integers, so a single pass handles millions of
+    rows.
+
+    With ``mode='drop'`` duplicates and conflicts are left out, and the
+    first version of each game is kept.  With ``mode='flag'`` every row
+    is kept.  Either way each one is passed to ``flagged``, if it's
+    given, as ``(kind, row)`` where kind is ``'duplicate'`` or
+    ``'conflict'``, and counted in :attr:`stats`.
+    """
 
-    :param:`source` is an iterable source of History instances.  Usually
-        an instance of :class:`HistoryReader`.
-    :param:`sport` is an instance of :class:`SportFactor`.
+    def __init__(self, mode: Literal['drop', 'flag'] = 'drop', flagged=None):
+        self.mode = mode
+        self.flagged = flagged
+        self.stats = MergeStats()
+        self.index = {}
+        self.names = {}
+        self.dates = {}
+
+    def key(self, date, team1, score1, team2, score2):
+        """``(key, scores)`` for a row, with the teams in a fixed order."""
+        d = self.dates.get(date)
+        if d is None:
+            d = self.dates.setdefault(normalizeDate(date), len(self.dates))
+            self.dates[date] = d
+        ids = []
+        for name in team1, team2:
+            i = self.names.get(name)
+            if i is None:
+                i = self.names.setdefault(' '.join(name.casefold().split()), len(self.names))
+                self.names[name] = i
+            ids.append(i)
+        t1, t2 = ids
+        if t1 <= t2:
+            return (d, t1, t2), (int(score1), int(score2))
+        return (d, t2, t1), (int(score2), int(score1))
+
+    def add(self, schedule: Schedule) -> None:
+        """Index the games already in a schedule, so rows that repeat
+        them are found."""
+        names, dates = schedule.names, schedule.dates
+        for d, t1, s1, t2, s2 in zip(schedule.date, schedule.team1, schedule.score1,
+                                     schedule.team2, schedule.score2):
+            key, scores = self.key(dates[d], names[t1], s1, names[t2], s2)
+            self.index.setdefault(key, scores)
+
+    def rows(self, rows):
+        """Yield the rows to keep, from ``(date, team1, score1, team2,
+        score2)`` rows."""
+        index, stats, drop = self.index, self.stats, self.mode == 'drop'
+        for row in rows:
+            stats.rows += 1
+            key, scores = self.key(*row)
+            first = index.setdefault(key, scores)
+            if first is scores:
+                stats.games += 1
+                yield row
+                continue
+            kind = 'duplicate' if first == scores else 'conflict'
+            if kind == 'duplicate':
+                stats.duplicates += 1
+            else:
+                stats.conflicts += 1
+            if self.flagged:
+                self.flagged(kind, row)
+            if not drop:
+                yield row
+
+
+def printMergeStats(stats: MergeStats, mode: str) -> None:
+    print('Merged {0.rows} rows into {0.games} games: {0.duplicates} duplicates, '
+          '{0.conflicts} conflicting scores{1}.'.format(
+              stats, ' (dropped)' if mode == 'drop' else ' (kept)'))
+
+
+class ScheduleCache:
+    """An on-disk cache of parsed schedules.
+
+    Each entry is a :class:`Schedule` for one history file, or several
+    read as one season, read with one reader class and normalized for one
+    :class:`SportFactor`.  The key is a hash of the files' content plus
+    those parameters, so an edited file or different sport gets a new
+    entry.
+
+    Entries are written with :meth:`Schedule.save` and read back through
+    a memory map with :meth:`Schedule.open`, so a warm run never parses
+    text.
     """
-    # Initialize totalpoints and totalgames to 0.
-    total_points = 0
-    total_games = 0
 
-    # Create a list called Schedule. This list will contain Game instances.
-    Schedule = []
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def key(self, paths, reader_class, sport: SportFactor, merge: str | None = None) -> str:
+        digest = hashlib.sha256()
+        for path in historyPaths(paths):
+            with open(path, 'rb') as source:
+                digest.update(hashlib.file_digest(source, 'sha256').digest())
+        digest.update(repr((reader_class.__name__, type(sport).__name__,
+                            sport.score_factor, sport.max_score, sport.exponent,
+                            merge)).encode())
+        return digest.hexdigest()
+
+    def entry(self, key) -> Path:
+        return self.directory / '{0}.schedule'.format(key)
+
+    def get(self, key, mapped: bool = False) -> Schedule | None:
+        """The cached Schedule, or None if there isn't a usable entry.
+        ``mapped`` is as for :meth:`Schedule.open`."""
+        return self.open(key, mapped)[0]
+
+    def open(self, key, mapped: bool = False) -> tuple[Schedule | None, dict]:
+        """The cached Schedule and its ``extra`` values, or None and an
+        empty dict."""
+        try:
+            return Schedule.open(self.entry(key), mapped)
+        except (OSError, ValueError):
+            return None, {}
+
+    def put(self, key, schedule: Schedule, **extra) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        schedule.save(self.entry(key), **extra)
+
+    def schedule(self, paths, reader_class, sport: SportFactor,
+                 mapped: bool = False, merger: 'GameMerger | None' = None) -> Schedule:
+        """The Schedule for a history file, or a list of them read as one
+        season, parsing them only on a cache miss.
+
+        With ``mapped``, a miss is parsed straight into the cache with
+        :meth:`Schedule.saveRows`, and the entry is opened memory-mapped.
+        With a :class:`GameMerger`, a miss reads the rows through it and
+        stores its :class:`MergeStats` in the entry; a hit restores them,
+        so they can be reported either way.
+        """
+        key = self.key(paths, reader_class, sport, merger.mode if merger else None)
+        schedule, extra = self.open(key, mapped)
+        if schedule is not None:
+            if merger and extra.get('merge'):
+                merger.stats = MergeStats(**extra['merge'])
+            return schedule
+
+        rows = reader_class.readRows(historyPaths(paths))
+        extra = {}
+        if merger:
+            # Filled in once the last row is read, which is before the
+            # entry's header is written.
+            extra['merge'] = merge = {}
+
+            def merged(rows):
+                yield from merger.rows(rows)
+                merge.update(asdict(merger.stats))
+
+            rows = merged(rows)
+        if mapped:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            Schedule.saveRows(self.entry(key), rows, sport, **extra)
+            schedule, _ = Schedule.open(self.entry(key), mapped)
+        else:
+            schedule = Schedule()
+            schedule.extend(rows, sport)
+            self.put(key, schedule, **extra)
+        return schedule
 
-    # Create a mapping from team name to Team instance.
-    # of teams.
-    TeamList = {}
 
-    # Start reading the Schedule list. For each game, we will determine
-    # the two teams involved, and get their information and update it.
-    # We will also calculate the game_ratio and determine the expected
-    # game_ratio so that we can provide a way to determine the performance
-    # of each team in the game.
-    for history in source:
+def historyPaths(paths) -> list:
+    """A list of history file paths, given one path or several."""
+    if isinstance(paths, (str, os.PathLike)):
+        return [paths]
+    return list(paths)
 
-        # Create the Game, including the game_ratio, based on History.
-        game = Game(history, sport)
 
-        # Add the game to the Schedule.
-        Schedule.append(game)
+class ResultCache:
+    """A cache of solved team tables, in memory and optionally on disk.
 
-        # Calculate the total number of points scored.
-        total_points = total_points + game.score1 + game.score2
+    The key is the :meth:`Schedule.digest` plus the :class:`SportFactor`
+    and solver parameters, so the same season solved the same way is only
+    solved once.  Each entry holds every :class:`Team` and the
+    :class:`SolverResult`.
 
-        # Create the teams, if they didn't already exist.
-        team1 = TeamList.setdefault(game.team1, Team(game.team1))
-        team2 = TeamList.setdefault(game.team2, Team(game.team2))
+    Entries are kept in a class-level table shared by all instances, up
+    to :attr:`memory_entries`, least recently used first out.  With a
+    ``directory``, entries are also written there as JSON, and the least
+    recently used files are removed once they add up to more than
+    ``max_bytes``.
+    """
+
+    #: The most entries kept in memory.
+    memory_entries = 32
+
+    # Entries already read or solved in this process, oldest first.
+    memory = {}
+
+    def __init__(self, directory=None, max_bytes: int = 256 << 20):
+        self.directory = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+
+    def key(self, schedule: Schedule, sport: SportFactor, engine: str, solver: str,
+            components: bool = False, kfactor: float = 10.0, home_field: bool = False) -> str:
+        digest = hashlib.sha256(schedule.digest().encode())
+        digest.update(repr((type(sport).__name__, sport.score_factor, sport.max_score,
+                            sport.exponent, None if SOLVERS[solver] else engine, solver,
+                            components, kfactor, home_field)).encode())
+        return digest.hexdigest()
+
+    def entry(self, key) -> Path:
+        return self.directory / '{0}.result'.format(key)
+
+    def get(self, key) -> tuple[dict[str, Team], SolverResult] | None:
+        """A fresh copy of the cached teams and result, or None."""
+        value = self.memory.pop(key, None)
+        if value is None and self.directory:
+            try:
+                with open(self.entry(key)) as source:
+                    value = json.load(source)
+            except (OSError, ValueError):
+                return None
+        if value is None:
+            return None
+        if self.directory:
+            # The file's modification time is its last use, for evict().
+            with contextlib.suppress(OSError):
+                os.utime(self.entry(key))
+        try:
+            teams = {values[0]: Team(*values) for values in value['teams']}
+            result = SolverResult(*value['result'])
+        except (KeyError, TypeError):
+            return None
+        self.remember(key, value)
+        return teams, result
+
+    def put(self, key, teams: dict[str, Team], result: SolverResult) -> None:
+        value = {'teams': [[getattr(t, name) for name in Team.__match_args__]
+                           for t in teams.values()],
+                 'result': [getattr(result, name) for name in SolverResult.__match_args__]}
+        self.remember(key, value)
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as target:
+                json.dump(value, target)
+            os.replace(temporary, self.entry(key))
+            self.evict()
+
+    def remember(self, key, value) -> None:
+        self.memory[key] = value
+        while len(self.memory) > self.memory_entries:
+            del self.memory[next(iter(self.memory))]
+
+    def evict(self) -> None:
+        """Remove the least recently used files over :attr:`max_bytes`."""
+        entries = []
+        for path in self.directory.glob('*.result'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# Sports by class name, for files that record which one was used.
+SPORTS = {cls.__name__: cls for cls in (SportFactor, Football, Basketball)}
 
-        #Update the won-lost-tied record and pts
-        #scored and pts allowed for each of the two teams involved in a game.
-        team1.updateStats(game.score1, game.score2)
-        team2.updateStats(game.score2, game.score1)
 
-    # Get the total number of games played.
-    total_games = len(Schedule)
+@dataclass(slots=True)
+class RankingState:
+
+    """A season in progress, saved between runs.
+
+    The state holds the schedule so far, each team's totals and its
+    converged power.  New games are appended with :meth:`ingest`, which
+    updates the totals of just the teams involved; :meth:`solve` then
+    starts from the stored ratings, so it only has to absorb the new
+    results.
+    """
+    sport: SportFactor
+    schedule: Schedule = field(default_factory=Schedule)
+    teams: dict[str, Team] = field(default_factory=dict)
+    #: The home team's advantage from the last solve with the home-field term.
+    home_advantage: float = 0.0
+
+    @classmethod
+    def open(cls, path) -> 'RankingState':
+        """Read a state file written by :meth:`save`."""
+        schedule, extra = Schedule.open(path)
+        try:
+            sport_name, score_factor, max_score, exponent = extra['sport']
+            sport = SPORTS[sport_name](score_factor, max_score, exponent)
+            teams = {values[0]: Team(*values) for values in extra['teams']}
+            home_advantage = float(extra['home_advantage'])
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError("Not a ranking state file: {0}".format(path)) from error
+        return cls(sport, schedule, teams, home_advantage)
+
+    def save(self, path) -> None:
+        sport = [type(self.sport).__name__, self.sport.score_factor, self.sport.max_score,
+                 self.sport.exponent]
+        teams = [[getattr(t, name) for name in Team.__match_args__] for t in self.teams.values()]
+        self.schedule.save(path, sport=sport, teams=teams, home_advantage=self.home_advantage)
+
+    def ingest(self, rows) -> int:
+        """Append games from ``(date, team1, score1, team2, score2)`` rows,
+        such as :meth:`HistoryReader.rows`.  Returns the number added."""
+        schedule = self.schedule
+        start = len(schedule)
+        try:
+            schedule.extend(rows, self.sport)
+        finally:
+            # If a row is invalid, the games before it have been added;
+            # their teams' totals must be too.
+            names = schedule.names
+            for i in range(start, len(schedule)):
+                team1, team2 = names[schedule.team1[i]], names[schedule.team2[i]]
+                score1, score2 = schedule.score1[i], schedule.score2[i]
+                self.teams.setdefault(team1, Team(team1)).updateStats(score1, score2, False)
+                self.teams.setdefault(team2, Team(team2)).updateStats(score2, score1, True)
+        return len(schedule) - start
+
+    def solve(self, engine: str = 'python', solver: str = 'fixed', observer=None,
+              home_field: bool = False) -> SolverResult:
+        """Bring the ratings up to date, starting from the stored ones.
+        With ``home_field`` the home advantage is solved for and stored too."""
+        calc = solverFor(engine, solver, home_field)
+        result = calc(self.teams, len(self.schedule), self.schedule, observer)
+        self.home_advantage = result.home_advantage
+        return result
+
+
+def load(source: HistoryReader, sport: Callable[[int, int], float],
+         engine: str = 'python', solver: str = 'fixed',
+         observer=None, profile: Profile | None = None,
+         components: bool = False, jobs: int = 1,
+         results: 'ResultCache | None' = None,
+         home_field: bool = False) -> tuple[int, int, dict[str, Team]]:
+    """Load the TeamList and some totals.  The arguments are as for
+    :func:`loadSeason`."""
+    return loadSeason(source, sport, engine, solver, observer, profile, components,
+                      jobs, results, home_field)[:3]
+
+
+def loadSeason(source: HistoryReader, sport: Callable[[int, int], float],
+               engine: str = 'python', solver: str = 'fixed',
+               observer=None, profile: Profile | None = None,
+               components: bool = False, jobs: int = 1,
+               results: 'ResultCache | None' = None,
+               home_field: bool = False) -> tuple[int, int, dict[str, Team], SolverResult]:
+    """Load the TeamList and some totals, and the :class:`SolverResult`.
+
+    :param:`source` is an iterable source of History instances.  Usually
+        an instance of :class:`HistoryReader`.  It may also be a
+        :class:`Schedule` that has already been read.
+    :param:`sport` is an instance of :class:`SportFactor`.
+    :param:`engine` is the name of a rating engine in :data:`ENGINES`.
+    :param:`solver` is the name of a solver in :data:`SOLVERS`.
+    :param:`observer` is given an :class:`IterationStats` after every
+        iteration of the solver.
+    :param:`profile` is an optional :class:`Profile` that records the
+        time spent in each phase, and the solver's telemetry.
+    :param:`components` solves each connected group of teams separately,
+        with :func:`calcComponentRatings`, using ``jobs`` processes.
+    :param:`results` is an optional :class:`ResultCache`; on a hit the
+        solve is skipped and the cached ratings are used.
+    :param:`home_field` also solves for the home team's advantage; it's
+        in the result.  It can't be combined with ``components``, since
+        the advantage is shared by every group.
+    """
+    if home_field and components:
+        raise ValueError("The home-field term can't be solved one group at a time")
+    calc = solverFor(engine, solver, home_field)
+    if profile and not observer:
+        observer = profile
+
+    # Create the Schedule.  Team names are interned to integer ids as
+    # the games are added, and the games are kept as compact columns.
+    schedule = Schedule()
+
+    # Start reading the History. For each game, we will determine
+    # the two teams involved and calculate the game_ratio so that we
+    # can provide a way to determine the performance of each team in
+    # the game.
+    with phase(profile, 'parse'):
+        if isinstance(source, Schedule):
+            schedule = source
+        elif isinstance(source, HistoryReader):
+            schedule = source.schedule(sport)
+        else:
+            for history in source:
+                schedule.append(history, sport)
+
+    with phase(profile, 'games'):
+        # Calculate the total number of points scored and games played.
+        total_points = schedule.totalPoints()
+        total_games = len(schedule)
+
+        # Update the won-lost-tied record and pts scored and pts allowed
+        # for each team, then create the mapping from team name to Team.
+        TeamList = schedule.teamTable().teams()
+
+        # Find the groups of teams that are connected by games.  Only
+        # the team labels are kept unless the groups are solved separately.
+        labels = componentLabels(schedule.team1, schedule.team2, len(schedule.names))
+        groups = schedule.components(labels) if components else None
+    printComponentWarning(labels)
 
     # Calculate the rankings.
-    calcTeamRatings(TeamList, total_games, Schedule)
+    with phase(profile, 'solve'):
+        key = (results.key(schedule, sport, engine, solver, components, home_field=home_field)
+               if results else None)
+        cached = results.get(key) if results else None
+        if cached:
+            TeamList, result = cached
+        elif groups and len(groups) > 1:
+            result = calcComponentRatings(TeamList, schedule, calc, groups, jobs, observer)
+        else:
+            result = calc(TeamList, total_games, schedule, observer)
+        if results and not cached:
+            results.put(key, TeamList, result)
+    if profile:
+        profile.result = result
+        profile.details.update(games=total_games, teams=len(TeamList), cached=bool(cached))
+    printSolverResult(result)
 
     # Return values for display.
-    return total_games, total_points, TeamList
+    return total_games, total_points, TeamList, result
+
+
+@dataclass(slots=True)
+class Timeline:
+
+    """Ratings as of a series of dates: a team by date matrix.
+
+    ``ratings[team * len(dates) + column]`` is the power of
+    ``names[team]`` as of ``dates[column]``; it's NaN before the team's
+    first game.
+    """
+    names: list[str]
+    dates: list[str]
+    ratings: array
+    results: list[SolverResult] = field(default_factory=list)
+
+    def rating(self, team: str, date: str) -> float:
+        return self.ratings[self.names.index(team) * len(self.dates) + self.dates.index(date)]
+
+    def write(self, target) -> None:
+        """Write the matrix as CSV: one row per team, one column per date."""
+        writer = csv.writer(target)
+        writer.writerow(['Team'] + self.dates)
+        width = len(self.dates)
+        for i, name in enumerate(self.names):
+            row = self.ratings[i * width:(i + 1) * width]
+            writer.writerow([name.upper()] + ['' if math.isnan(r) else f"{r:.3f}" for r in row])
+
+
+def calcTimeline(schedule: Schedule, every: int = 1, engine: str = 'python',
+                 solver: str = 'fixed', observer=None, home_field: bool = False) -> Timeline:
+    """Compute the ratings as of every ``every``-th date of a season.
+
+    The games are sorted by date once, as :func:`normalizeDate` reads
+    them, so ``10/01/1979`` comes after ``9/08/1979``; dates in none of
+    the :data:`DATE_FORMATS` sort as text.  Each step solves the games
+    played up to its date, starting from the previous step's ratings, so
+    most steps need only a few iterations.  The last date is always included.
+
+    :param:`engine`, :param:`solver`, :param:`observer` and
+        :param:`home_field` are as for :func:`load`.
+    """
+    calc = solverFor(engine, solver, home_field)
+    keys = [normalizeDate(date) for date in schedule.dates]
+    ordered = schedule.subset(sorted(range(len(schedule)),
+                                     key=lambda i: keys[schedule.date[i]]))
+    columns = list(range(every - 1, len(ordered.dates), every))
+    if ordered.dates and (not columns or columns[-1] != len(ordered.dates) - 1):
+        columns.append(len(ordered.dates) - 1)
+    timeline = Timeline(ordered.names, [ordered.dates[c] for c in columns],
+                        array('d', [math.nan]) * (len(ordered.names) * len(columns)))
+    width = len(columns)
+    power = {}
+    end = 0
+    for column, last_date in enumerate(columns):
+        # The games are in date order, so this date's games end where
+        # the next date's begin.
+        while end < len(ordered) and ordered.date[end] <= last_date:
+            end += 1
+        prefix = ordered.subset(range(end))
+        teams = prefix.teamTable().teams()
+        for name, team in teams.items():
+            team.power = power.get(name, team.power)
+        timeline.results.append(calc(teams, end, prefix, observer))
+        for name, team in teams.items():
+            power[name] = team.power
+            timeline.ratings[ordered.ids[name] * width + column] = team.power
+    return timeline
+
+
+def predictGames(teamlist, matchups, kfactor=10.0, chunk_size=1 << 16, home_advantage=0.0):
+    """Predict the outcome of many games.
+
+    :param:`teamlist` maps casefolded team names to :class:`Team`, with
+        converged ratings.  A team that isn't there gets the starting
+        rating of 100.
+    :param:`matchups` is an iterable of ``(date, team1, team2)``.
+    :param:`home_advantage` is added to team2's rating, the home team's.
+
+    Yields ``(date, team1, team2, expected)`` where ``expected`` is
+    :func:`expectedGameResult` for team1.  The matchups are consumed
+    ``chunk_size`` at a time and, with :mod:`numpy`, each chunk is
+    computed as one array operation.
+    """
+    matchups = iter(matchups)
+    while chunk := list(itertools.islice(matchups, chunk_size)):
+        power1 = [teamlist[t1.casefold()].power if t1.casefold() in teamlist else 100.0
+                  for _, t1, _ in chunk]
+        power2 = [teamlist[t2.casefold()].power if t2.casefold() in teamlist else 100.0
+                  for _, _, t2 in chunk]
+        if np is not None:
+            expected = (1 / (1 + np.power(10, (np.array(power2) + home_advantage
+                                               - np.array(power1)) / kfactor))).tolist()
+        else:
+            expected = [expectedGameResult(p1, p2, kfactor, home_advantage)
+                        for p1, p2 in zip(power1, power2)]
+        for (date, team1, team2), e in zip(chunk, expected):
+            yield date, team1, team2, e
+
+
+def predictAllPairs(teamlist, teams=None, kfactor=10.0):
+    """Predict every pairing of a set of teams.
+
+    :param:`teams` is an iterable of team names; all the teams in
+        ``teamlist`` by default.
+
+    Yields lists of ``(team1, team2, expected)``, one list per team1,
+    covering each pair once.  Only one such list is held at a time, so
+    the full matrix is never built.
+    """
+    names = [name.casefold() for name in teams] if teams is not None else list(teamlist)
+    power = [teamlist[name].power if name in teamlist else 100.0 for name in names]
+    if np is not None:
+        power = np.array(power)
+    for i, team1 in enumerate(names[:-1]):
+        if np is not None:
+            expected = (1 / (1 + np.power(10, (power[i + 1:] - power[i]) / kfactor))).tolist()
+        else:
+            expected = [expectedGameResult(power[i], p2, kfactor) for p2 in power[i + 1:]]
+        yield [(team1, team2, e) for team2, e in zip(names[i + 1:], expected)]
+
+
+def writePredictions(args, teamlist, home_advantage=0.0):
+    """Write ``--predict`` or ``--all-pairs`` predictions as CSV, to the
+    ``--output`` file or the console.  ``--predict`` games get the
+    ``home_advantage``; all-pairs predictions are for a neutral site."""
+    with contextlib.ExitStack() as stack:
+        if args.output:
+            target = stack.enter_context(open(args.output, 'w', newline='', buffering=1 << 16))
+        else:
+            target = sys.stdout
+        writer = csv.writer(target)
+        if args.predict:
+            writer.writerow(['Date', 'Team1', 'Team2', 'Expected'])
+            source = stack.enter_context(open(args.predict))
+            for date, team1, team2, expected in predictGames(
+                    teamlist, MatchupReader(source, args.format),
+                    home_advantage=home_advantage):
+                writer.writerow([date, team1, team2, f"{expected:.6f}"])
+        else:
+            writer.writerow(['Team1', 'Team2', 'Expected'])
+            teams = None
+            if args.teams:
+                with open(args.teams) as source:
+                    teams = [line.strip() for line in source if line.strip()]
+            for chunk in predictAllPairs(teamlist, teams):
+                writer.writerows((team1, team2, f"{expected:.6f}")
+                                 for team1, team2, expected in chunk)
+
+
+# Per-process state for the workers of :func:`mapWithState`.
+_worker = {}
+
+
+def startWorker(state: dict) -> None:
+    _worker.clear()
+    _worker.update(state)
+
+
+def workerState() -> dict:
+    """The ``state`` given to :func:`mapWithState`, in a task it runs."""
+    return _worker
+
+
+def mapWithState(function, batches, jobs: int = 1, **state) -> list:
+    """``[function(batch) for batch in batches]``, in a pool of ``jobs``
+    processes if ``jobs`` is more than 1.
+
+    Large, shared inputs go in ``state``: each process receives it once
+    rather than once per batch, and ``function`` reads it with
+    :func:`workerState`.
+    """
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=startWorker,
+                                 initargs=(state,)) as pool:
+            return list(pool.map(function, batches))
+    startWorker(state)
+    return [function(batch) for batch in batches]
+
+
+def bootstrapReplicates(seeds):
+    """Solve one bootstrap replicate of the schedule for each seed.
+
+    Each replicate draws as many games as the schedule has, with
+    replacement, and solves them starting from the full-schedule
+    ratings.  Returns one array per replicate of each team's power, by
+    team id; NaN for a team that wasn't drawn.
+    """
+    state = workerState()
+    schedule, power, calc = state['schedule'], state['power'], state['calc']
+    replicates = []
+    for seed in seeds:
+        rng = random.Random(seed)
+        games = rng.choices(range(len(schedule)), k=len(schedule))
+        sample = schedule.subset(games)
+        teams = sample.teamTable().teams()
+        for name, team in teams.items():
+            team.power = power[name]
+        calc(teams, len(sample), sample)
+        ratings = array('d', [math.nan]) * len(schedule.names)
+        for name, team in teams.items():
+            ratings[schedule.ids[name]] = team.power
+        replicates.append(ratings)
+    return replicates
+
+
+def percentile(values, fraction):
+    """Linearly interpolated percentile of sorted values."""
+    if not values:
+        return math.nan
+    position = fraction * (len(values) - 1)
+    below = int(position)
+    above = min(below + 1, len(values) - 1)
+    return values[below] + (values[above] - values[below]) * (position - below)
+
+
+@dataclass(slots=True)
+class Bootstrap:
+
+    """Bootstrap intervals for each team's rating and rank.
+
+    The lists are indexed by the team ids of the schedule.  Ranks run
+    from 1, the best.
+    """
+    names: list[str]
+    power: list[float]
+    low: list[float]
+    high: list[float]
+    rank_low: list[float]
+    rank_high: list[float]
+    replicates: int
+    confidence: float
+
+    def write(self, target) -> None:
+        """Write the intervals as CSV, best team first."""
+        writer = csv.writer(target)
+        writer.writerow(['Rank', 'Team', 'Rating', 'Low', 'High', 'Best Rank', 'Worst Rank'])
+        order = sorted(range(len(self.names)), key=lambda i: self.power[i], reverse=True)
+        for rank, i in enumerate(order, start=1):
+            writer.writerow([rank, self.names[i].upper(), f"{self.power[i]:.3f}",
+                             f"{self.low[i]:.3f}", f"{self.high[i]:.3f}",
+                             f"{self.rank_low[i]:.0f}", f"{self.rank_high[i]:.0f}"])
+
+
+def calcBootstrap(schedule: Schedule, teamlist, replicates: int = 500,
+                  confidence: float = 0.95, engine: str = 'python', solver: str = 'fixed',
+                  jobs: int = 1, seed: int = 1979, batch_size: int = 25,
+                  home_field: bool = False) -> Bootstrap:
+    """Bootstrap confidence intervals for the ratings and ranks.
+
+    The schedule's games are resampled with replacement ``replicates``
+    times and each resample is solved again.  The replicates are solved
+    in batches of ``batch_size``, in a pool of ``jobs`` processes that
+    each receive the schedule once.  Each solve starts from the ratings
+    in ``teamlist``, which should already be converged, so it only has
+    to absorb the differences.
+
+    The intervals are the central ``confidence`` fraction of each team's
+    replicate ratings and ranks.  With ``home_field`` each replicate
+    solves for its own home advantage, as the full schedule did.
+    """
+    calc = solverFor(engine, solver, home_field)
+    power = {name: team.power for name, team in teamlist.items()}
+    seeds = [seed + i for i in range(replicates)]
+    batches = [seeds[i:i + batch_size] for i in range(0, len(seeds), batch_size)]
+    results = mapWithState(bootstrapReplicates, batches, jobs,
+                           schedule=schedule.inMemory() if jobs > 1 else schedule,
+                           power=power, calc=calc)
+
+    size = len(schedule.names)
+    ratings = [[] for _ in range(size)]
+    ranks = [[] for _ in range(size)]
+    for replicate in itertools.chain.from_iterable(results):
+        present = sorted((i for i in range(size) if not math.isnan(replicate[i])),
+                         key=replicate.__getitem__, reverse=True)
+        for rank, i in enumerate(present, start=1):
+            ratings[i].append(replicate[i])
+            ranks[i].append(rank)
+    tail = (1 - confidence) / 2
+    for values in itertools.chain(ratings, ranks):
+        values.sort()
+    return Bootstrap(
+        schedule.names, [power[name] for name in schedule.names],
+        [percentile(values, tail) for values in ratings],
+        [percentile(values, 1 - tail) for values in ratings],
+        [percentile(values, tail) for values in ranks],
+        [percentile(values, 1 - tail) for values in ranks],
+        replicates, confidence)
 
 
 def report(args, totalgames, totalpoints, TeamList):
@@ -440,14 +2504,184 @@ def report(args, totalgames, totalpoints, TeamList):
     printRankings(args, TeamList)
 
 
-def processRankings(args, source, sport):
+def processRankings(args, source, sport, profile=None):
     """The default command-line app: load and report."""
 
     # Step 1: Load the data from the file, compute the rankings.
-    total_games, total_points, TeamList = load(source, sport)
+    results = ResultCache(args.result_cache) if args.result_cache else None
+    total_games, total_points, TeamList, result = loadSeason(
+        source, sport, args.engine, args.solver, profile=profile,
+        components=args.components, jobs=args.jobs, results=results,
+        home_field=args.home_field)
+
+    # Optionally, resample the schedule for confidence intervals.
+    if args.bootstrap:
+        with phase(profile, 'bootstrap'):
+            bootstrap = calcBootstrap(asSchedule(source), TeamList, args.bootstrap,
+                                      args.confidence, args.engine, args.solver, args.jobs,
+                                      home_field=args.home_field)
+
+    # Step 2: Print a report, predictions or intervals.
+    with phase(profile, 'report'):
+        if args.bootstrap:
+            with contextlib.ExitStack() as stack:
+                target = (stack.enter_context(open(args.output, 'w', newline=''))
+                          if args.output else sys.stdout)
+                bootstrap.write(target)
+        elif args.predict or args.all_pairs:
+            writePredictions(args, TeamList, result.home_advantage)
+        else:
+            report(args, total_games, total_points, TeamList)
+
 
-    # Step 2: Print a report.
-    report(args, total_games, total_points, TeamList)
+# File name suffixes of compressed history files, left out of output names.
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.lzma')
+
+
+def outputLabels(paths) -> list[str]:
+    """A distinct label for each history file, to add to its output names.
+
+    The label is the file name without its suffixes: ``scores1979.txt.gz``
+    is ``scores1979``.  Files with the same name are told apart by their
+    directory, ``y1_scores``, and failing that by their position.
+    """
+    labels = []
+    for path in map(Path, paths):
+        if path.suffix in COMPRESSED_SUFFIXES:
+            path = path.with_suffix('')
+        labels.append(path.stem)
+    if len(set(labels)) < len(labels):
+        labels = ['_'.join(filter(None, (Path(path).parent.name, label)))
+                  for path, label in zip(paths, labels)]
+    if len(set(labels)) < len(labels):
+        labels = ['{0}_{1}'.format(label, i) for i, label in enumerate(labels, start=1)]
+    return labels
+
+
+def outputFor(args, paths, index):
+    """The output options for ``paths[index]``, one of several history files.
+
+    With a single file, the options are used as given.  With several,
+    each file's label from :func:`outputLabels` is added to the output
+    names so they don't collide: ``--output ranks.txt`` becomes
+    ``ranks_scores1979.txt``, and the default ``rankings.csv`` becomes
+    ``rankings_scores1979.csv``.
+    """
+    if len(paths) == 1:
+        return args
+    stem = outputLabels(paths)[index]
+    if args.output:
+        output = Path(args.output)
+        return argparse.Namespace(**{**vars(args),
+            'output': str(output.with_name(f"{output.stem}_{stem}{output.suffix}"))})
+    return argparse.Namespace(**{**vars(args), 'csv_output': f"rankings_{stem}.csv"})
+
+
+def readSchedule(args, paths):
+    """Parse history files into one :class:`Schedule`, through the
+    ``--cache`` directory if there is one.  Standard input, ``-``, isn't
+    cached.
+
+    For the ``chunked`` engine the games are streamed into a schedule
+    file, in the cache or a temporary directory, which is opened
+    memory-mapped; they're never all in memory.
+    """
+    mapped = args.engine == 'chunked'
+    merger = mergerFor(args)
+    if args.cache and '-' not in paths:
+        schedule = ScheduleCache(args.cache).schedule(paths, args.reader_class, args.sport,
+                                                      mapped, merger)
+    else:
+        rows = args.reader_class.readRows(paths)
+        if merger:
+            rows = merger.rows(rows)
+        if not mapped:
+            schedule = Schedule()
+            schedule.extend(rows, args.sport)
+        else:
+            # The open memory map keeps the file's data after it's removed.
+            with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+                entry = Path(directory) / 'games.schedule'
+                Schedule.saveRows(entry, rows, args.sport)
+                schedule, _ = Schedule.open(entry, mapped)
+    if merger and merger.stats.rows:
+        printMergeStats(merger.stats, merger.mode)
+    return schedule
+
+
+def mergerFor(args) -> GameMerger | None:
+    """The :class:`GameMerger` for ``--dedup``, if it was given.  In
+    ``flag`` mode each repeated game is listed on standard error."""
+    if not args.dedup:
+        return None
+
+    def flagged(kind, row):
+        print('{0}: {1}'.format(kind.capitalize(), '|'.join(map(str, row))), file=sys.stderr)
+
+    return GameMerger(args.dedup, flagged if args.dedup == 'flag' else None)
+
+
+def processFile(args, paths):
+    """Read, load and report one season: a list of history files,
+    usually just one.
+
+    With ``--profile``, a JSON summary of the time spent in each phase
+    is written to standard error as one line.
+    """
+    profile = Profile(file=' '.join(map(str, paths))) if args.profile else None
+    with phase(profile, 'parse'):
+        schedule = readSchedule(args, paths)
+    if args.timeline:
+        with phase(profile, 'solve'):
+            timeline = calcTimeline(schedule, args.timeline, args.engine, args.solver, profile,
+                                    args.home_field)
+        with phase(profile, 'report'):
+            if args.output:
+                with open(args.output, 'w', newline='') as target:
+                    timeline.write(target)
+            else:
+                timeline.write(sys.stdout)
+    else:
+        processRankings(args, schedule, args.sport, profile)
+    if profile:
+        print(json.dumps(profile.summary()), file=sys.stderr)
+
+
+def rankFile(args, paths):
+    """Load and report one season.
+
+    This is the unit of work for ``--jobs``.  The printed report is
+    captured and returned so the caller can print the reports in the
+    order the files were given.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        processFile(args, paths)
+    return output.getvalue()
+
+
+def ingest(args):
+    """Add the games in the history files to the ``--ingest`` state file,
+    creating it if need be, then re-solve, report and save it."""
+    state_path = Path(args.ingest)
+    state = RankingState.open(state_path) if state_path.exists() else RankingState(args.sport)
+    merger = mergerFor(args)
+    if merger:
+        # Games already in the state count as seen.
+        merger.add(state.schedule)
+    for path in args.file_list:
+        rows = args.reader_class.readRows([path])
+        added = state.ingest(merger.rows(rows) if merger else rows)
+        print('Added {0} games from {1}.'.format(added, path))
+    if merger:
+        printMergeStats(merger.stats, merger.mode)
+    result = state.solve(args.engine, args.solver, home_field=args.home_field)
+    printSolverResult(result)
+    state.save(state_path)
+    if args.predict or args.all_pairs:
+        writePredictions(args, state.teams, state.home_advantage)
+    else:
+        report(args, len(state.schedule), state.schedule.totalPoints(), state.teams)
 
 
 def main():
@@ -460,24 +2694,71 @@ def main():
                         const=Basketball())
     parser.add_argument('-d', dest='format', action='store')
     parser.set_defaults(sport=SportFactor())
-    parser.add_argument('file_list', metavar='History File', type=open,
-                        nargs='+', help='Files with Game History')
+    parser.add_argument('file_list', metavar='History File',
+                        nargs='+', help='Files with Game History; - for standard input')
+    parser.add_argument('--concat', action='store_true',
+                        help='Rank all the history files together as one season')
+    parser.add_argument('--dedup', choices=('drop', 'flag'),
+                        help='Find games that appear more than once; drop them or just list them')
     parser.add_argument('--output', required=False)
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of history files to process at once')
+    parser.add_argument('--format', dest='formats', action='append',
+                        choices=REPORT_FORMATS,
+                        help='Report format; repeat for several (default: text and csv)')
+    parser.set_defaults(csv_output=None)
+    parser.add_argument('--predict', metavar='MATCHUPS',
+                        help='Predict the games in a file of upcoming matchups instead of reporting')
+    parser.add_argument('--all-pairs', action='store_true',
+                        help='Predict every pairing of teams instead of reporting')
+    parser.add_argument('--teams', metavar='FILE',
+                        help='With --all-pairs, only these teams (one name per line)')
+    parser.add_argument('--bootstrap', metavar='N', type=int,
+                        help='Write rating and rank intervals from N resampled schedules')
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help='Coverage of the --bootstrap intervals')
+    parser.add_argument('--components', action='store_true',
+                        help='Solve each connected group of teams separately, using --jobs processes')
+    parser.add_argument('--ingest', metavar='STATE',
+                        help='Add the games to a saved ranking state and re-solve from its ratings')
+    parser.add_argument('--timeline', metavar='N', type=int,
+                        help='Write ratings as of every N-th date as a team by date CSV matrix')
+    parser.add_argument('--profile', action='store_true',
+                        help='Write a JSON summary of time spent in each phase to stderr')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='Directory for cached, pre-parsed schedules')
+    parser.add_argument('--result-cache', metavar='DIR',
+                        help='Directory for cached, solved ratings')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='python',
+                        help='Rating engine; numpy uses whole-array iterations')
+    parser.add_argument('--solver', choices=list(SOLVERS), default='fixed',
+                        help='Rating solver; newton converges in far fewer sweeps')
+    parser.add_argument('--home-field', action='store_true',
+                        help='Also solve for the home team\'s advantage; team2 is at home')
     parser.add_argument('output_file', metavar='Rankings File', type=open,
                         nargs='?', help='The rankings file')
     args = parser.parse_args()
 
-    match args.format:
-        case None:
-            reader_class = CSVHistoryReader
-        case '|':
-            reader_class = PipeFormatHistoryReader
-        case _:
-            raise Exception("Unknown -d {0}".format(args.format))
-        
-    for source in args.file_list:
-        reader = reader_class(source)
-        processRankings(args, reader, args.sport)
+    args.reader_class = readerClass(args.format)
+    if args.home_field and args.components:
+        parser.error("--home-field can't be combined with --components: "
+                     "the home advantage is shared by every group")
+
+    seasons = [args.file_list] if args.concat else [[path] for path in args.file_list]
+    firsts = [paths[0] for paths in seasons]
+    if args.ingest:
+        ingest(args)
+    elif args.jobs > 1 and len(seasons) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            # The files are already spread across processes, so each
+            # file's groups of teams are solved in its own process.
+            file_args = [argparse.Namespace(**{**vars(outputFor(args, firsts, i)), 'jobs': 1})
+                         for i in range(len(seasons))]
+            for text in pool.map(rankFile, file_args, seasons):
+                print(text, end='')
+    else:
+        for i, paths in enumerate(seasons):
+            processFile(outputFor(args, firsts, i), paths)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,306 @@
+"""Team Rankings service.
+
+Synopsis
+==========
+
+    service.py [-d '|'] [--http 127.0.0.1:8079 | --unix rankings.sock]
+        LEAGUE=SPORT:FILE [LEAGUE=SPORT:FILE ...]
+
+Options
+==========
+
+Each league is named on the command line with its sport (``football``,
+``basketball`` or ``other``) and a history file, or a ranking state file
+written by ``rankings.py --ingest``.  History files may be compressed, and
+``-`` is standard input, as for ``rankings.py``.  The files are read and solved once at
+startup; after that the schedules and ratings stay in memory, so queries
+don't pay for starting Python, parsing or solving.
+
+The "-d" option is the history file format, as for ``rankings.py``.  The
+"--engine" and "--solver" options are passed to the rating solve.
+
+The "--http" option is the address to listen on, ``127.0.0.1:8079`` by
+default.  The "--unix" option listens on a Unix socket instead, for
+example for ``curl --unix-socket rankings.sock``.
+
+Requests
+==========
+
+The service speaks a small subset of HTTP/1.1 and answers in JSON.
+
+-   ``GET /``: the leagues, with their game counts and solver state.
+
+-   ``GET /LEAGUE/rankings``: the rankings, best first, in the same form
+    as the ``jsonl`` report.  ``?limit=N`` returns only the first N.
+
+-   ``GET /LEAGUE/teams/TEAM``: one team's ranking.
+
+-   ``GET /LEAGUE/predict?team1=A&team2=B``: the expected result for
+    team A, as for ``rankings.py --predict``.
+
+-   ``POST /LEAGUE/games``: add games, given as a JSON list of
+    ``[date, team1, score1, team2, score2]`` rows.  The games are queued
+    and the ratings re-solved in the background; until that finishes,
+    queries keep answering from the previous ratings.  The response is
+    ``202 Accepted``.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import rankings
+
+
+SPORTS = {
+    'football': rankings.Football,
+    'basketball': rankings.Basketball,
+    'other': rankings.SportFactor,
+}
+
+
+@dataclass(slots=True)
+class Ratings:
+
+    """The ratings of a league as of one solve.  A new instance is
+    published after every solve and never changed, so readers can use
+    it while the next solve runs."""
+    version: int
+    games: int
+    rankings: list[dict]
+    teams: dict[str, dict]
+    result: rankings.SolverResult | None
+
+    @classmethod
+    def of(cls, version, state, result):
+        ordered = rankings.sortDictByPower(state.teams.values())
+        rows = [{'rank': rank, 'team': team.name.upper(), 'won': team.won,
+                 'lost': team.lost, 'tied': team.tied, 'pf': team.pf, 'pa': team.pa,
+                 'home': rankings.splitRecord(team, 'h'),
+                 'visitor': rankings.splitRecord(team, 'v'),
+                 'power': team.power} for rank, team in enumerate(ordered, start=1)]
+        return cls(version, len(state.schedule), rows,
+                   {team.name: row for team, row in zip(ordered, rows)}, result)
+
+
+class League:
+
+    """One league's :class:`rankings.RankingState` and its published
+    :class:`Ratings`.
+
+    Only the solve task touches the state: queued games are ingested
+    between solves, and each solve runs in a worker thread so the event
+    loop keeps answering queries from :attr:`ratings`.
+    """
+
+    def __init__(self, name, state, engine='python', solver='fixed'):
+        self.name = name
+        self.state = state
+        self.engine = engine
+        self.solver = solver
+        self.pending = []
+        self.task = None
+        result = state.solve(engine, solver)
+        self.ratings = Ratings.of(1, state, result)
+
+    def submit(self, rows) -> None:
+        """Queue games and make sure a solve is on its way."""
+        self.pending.extend(rows)
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.resolve())
+
+    async def resolve(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self.pending:
+                rows, self.pending = self.pending, []
+                try:
+                    self.state.ingest(rows)
+                    result = await loop.run_in_executor(None, self.state.solve,
+                                                        self.engine, self.solver)
+                except Exception:
+                    # The published ratings are a separate snapshot, so
+                    # queries keep answering from the last good solve.
+                    print('League {0}: update failed, still serving version {1}.'.format(
+                        self.name, self.ratings.version), file=sys.stderr)
+                    traceback.print_exc()
+                    continue
+                self.ratings = Ratings.of(self.ratings.version + 1, self.state, result)
+        finally:
+            self.task = None
+
+    def status(self) -> dict:
+        ratings = self.ratings
+        return {'league': self.name, 'sport': type(self.state.sport).__name__,
+                'games': ratings.games, 'teams': len(ratings.rankings),
+                'version': ratings.version, 'pending': len(self.pending),
+                'solving': self.task is not None,
+                'iterations': ratings.result.iterations if ratings.result else None,
+                'converged': ratings.result.converged if ratings.result else None}
+
+
+def openLeague(spec, reader_class, engine='python', solver='fixed') -> League:
+    """A :class:`League` from a ``LEAGUE=SPORT:FILE`` command-line spec."""
+    name, _, rest = spec.partition('=')
+    sport_name, _, path = rest.partition(':')
+    if not name or sport_name not in SPORTS or not path:
+        raise ValueError("Expected LEAGUE=SPORT:FILE, not {0!r}".format(spec))
+    try:
+        state = rankings.RankingState.open(path)
+    except (OSError, ValueError):
+        # A history file, possibly compressed, or standard input.
+        state = rankings.RankingState(SPORTS[sport_name]())
+        state.ingest(reader_class.readRows([path]))
+    return League(name, state, engine, solver)
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed'}
+
+
+def handle(leagues, method, target, body):
+    """Answer one request.  Returns the status and a JSON-ready value."""
+    url = urlsplit(target)
+    parts = [unquote(part) for part in url.path.split('/') if part]
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    if not parts:
+        return 200, [league.status() for league in leagues.values()]
+    league = leagues.get(parts[0])
+    if league is None:
+        raise HTTPError(404, "No league {0!r}".format(parts[0]))
+    ratings = league.ratings
+
+    match method, parts[1:]:
+        case 'GET', []:
+            return 200, league.status()
+        case 'GET', ['rankings']:
+            try:
+                limit = int(query.get('limit', len(ratings.rankings)))
+            except ValueError:
+                raise HTTPError(400, "limit must be a number") from None
+            return 200, ratings.rankings[:limit]
+        case 'GET', ['teams', team]:
+            row = ratings.teams.get(team.casefold())
+            if row is None:
+                raise HTTPError(404, "No team {0!r}".format(team))
+            return 200, row
+        case 'GET', ['predict']:
+            try:
+                team1, team2 = query['team1'], query['team2']
+            except KeyError:
+                raise HTTPError(400, "team1 and team2 are required") from None
+            for team in (team1, team2):
+                if team.casefold() not in ratings.teams:
+                    raise HTTPError(404, "No team {0!r}".format(team))
+            expected = rankings.expectedGameResult(ratings.teams[team1.casefold()]['power'],
+                                                   ratings.teams[team2.casefold()]['power'], 10.0)
+            return 200, {'team1': team1, 'team2': team2, 'expected': expected}
+        case 'POST', ['games']:
+            try:
+                rows = [(str(date), str(team1), int(score1), str(team2), int(score2))
+                        for date, team1, score1, team2, score2 in json.loads(body or b'[]')]
+                for row in rows:
+                    league.state.sport.checkedGameRatio(row[2], row[4])
+            except (TypeError, ValueError) as error:
+                raise HTTPError(400, "Expected [date, team1, score1, team2, score2] rows: "
+                                "{0}".format(error)) from None
+            league.submit(rows)
+            return 202, {'queued': len(rows), 'pending': len(league.pending)}
+        case ('GET' | 'POST'), _:
+            raise HTTPError(404, "No such resource {0!r}".format(url.path))
+        case _:
+            raise HTTPError(405, "Method {0} not allowed".format(method))
+
+
+async def serve(leagues, reader, writer):
+    """Answer HTTP requests on one connection until the client closes it."""
+    try:
+        while True:
+            request = await reader.readline()
+            if not request.strip():
+                break
+            method, target, version = request.decode('latin-1').split(None, 2)
+            headers = {}
+            while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+            try:
+                status, value = handle(leagues, method, target, body)
+            except HTTPError as error:
+                status, value = error.status, {'error': str(error)}
+            payload = json.dumps(value).encode()
+            close = (headers.get('connection', '').lower() == 'close'
+                     or version.strip() == 'HTTP/1.0')
+            writer.write('HTTP/1.1 {0} {1}\r\nContent-Type: application/json\r\n'
+                         'Content-Length: {2}\r\n{3}\r\n'.format(
+                             status, REASONS[status], len(payload),
+                             'Connection: close\r\n' if close else '').encode() + payload)
+            await writer.drain()
+            if close:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(leagues, http=None, unix=None):
+    async def connected(reader, writer):
+        await serve(leagues, reader, writer)
+
+    if unix:
+        server = await asyncio.start_unix_server(connected, unix)
+        where = unix
+    else:
+        host, _, port = (http or '127.0.0.1:8079').rpartition(':')
+        server = await asyncio.start_server(connected, host or None, int(port))
+        where = http
+    print('Serving {0} on {1}.'.format(', '.join(leagues), where), flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rankings service')
+    parser.add_argument('-d', dest='format', action='store')
+    parser.add_argument('leagues', nargs='+', metavar='LEAGUE=SPORT:FILE')
+    parser.add_argument('--http', metavar='HOST:PORT', default='127.0.0.1:8079')
+    parser.add_argument('--unix', metavar='PATH', help='Listen on a Unix socket instead')
+    parser.add_argument('--engine', choices=sorted(rankings.ENGINES), default='python')
+    parser.add_argument('--solver', choices=list(rankings.SOLVERS), default='fixed')
+    args = parser.parse_args()
+
+    reader_class = rankings.readerClass(args.format)
+
+    start = time.perf_counter()
+    leagues = {}
+    for spec in args.leagues:
+        league = openLeague(spec, reader_class, args.engine, args.solver)
+        leagues[league.name] = league
+    print('Loaded {0} leagues in {1:.3f}s.'.format(len(leagues), time.perf_counter() - start))
+    try:
+        asyncio.run(run(leagues, args.http, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.unix:
+            Path(args.unix).unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
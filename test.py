@@ -8,9 +8,28 @@ for the rankings.py application.
 import unittest
 import sys
 import io
+import contextlib
 
 import rankings
 
+def synthetic_season( teams=24, rounds=6, seed=1979 ):
+    """A small, deterministic pipe-format season for tests that can't use
+    the captured fixture files."""
+    import random
+    rng= random.Random( seed )
+    lines= []
+    for r in range( rounds ):
+        order= list( range( teams ) )
+        rng.shuffle( order )
+        for a, b in zip( order[0::2], order[1::2] ):
+            lines.append( "19790{0}|Team {1}|{2}|Team {3}|{4}".format(
+                r+1, a, rng.randint(0,45), b, rng.randint(0,45) ) )
+    return "\n".join( lines ) + "\n"
+
+def load_synthetic( sport=None, **kw ):
+    reader= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) )
+    return rankings.load( reader, sport or rankings.Football(), **kw )
+
 class Test_Reports( unittest.TestCase ):
     def setUp( self ):
         with open("scores1979.txt","r") as source:
@@ -85,5 +104,686 @@ class TestBasketballSportFactor( unittest.TestCase ):
         a1, a2 = ((90-(90**2)/750)/3)**2, ((80-(80**2)/750)/3)**2
         self.assertAlmostEqual( ((a1+1)/(a1+a2+2)+1)/2, self.sf.gameRatio(90,80) )
 
+class TestGameRatioTable( unittest.TestCase ):
+    def test_should_match_game_ratio( self ):
+        for sf in rankings.SportFactor(), rankings.Football(), rankings.Basketball():
+            table, size= sf.gameRatioTable()
+            for s1 in range( 0, size, 7 ):
+                for s2 in range( 0, size, 5 ):
+                    self.assertEqual( sf.gameRatio(s1, s2), table[s1*size+s2] )
+            self.assertEqual( sf.gameRatio(500, 3), sf.lookupGameRatio(500, 3) )
+    def test_should_invalidate_on_change( self ):
+        sf= rankings.Football()
+        before= sf.lookupGameRatio( 21, 14 )
+        sf.max_score= 3.0
+        self.assertNotEqual( before, sf.lookupGameRatio( 21, 14 ) )
+        self.assertEqual( sf.gameRatio( 21, 14 ), sf.lookupGameRatio( 21, 14 ) )
+    def test_should_keep_few_tables( self ):
+        football= rankings.Football()
+        football.gameRatioTable()
+        for exponent in range( 2, 40 ):
+            rankings.SportFactor( exponent=exponent/10 ).gameRatioTable()
+            rankings.Football().gameRatioTable()
+        self.assertLessEqual( len(rankings.SportFactor.tables), rankings.SportFactor.table_entries )
+        self.assertIs( football.gameRatioTable()[0], rankings.Football().gameRatioTable()[0] )
+
+class TestObserver( unittest.TestCase ):
+    def solvers( self ):
+        yield rankings.calcTeamRatings
+        if rankings.np is not None:
+            yield rankings.calcTeamRatingsArray
+            yield rankings.calcTeamRatingsNewton
+    def test_should_receive_every_iteration( self ):
+        for calc in self.solvers():
+            schedule= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+            seen= []
+            result= calc( schedule.teamTable().teams(), len(schedule), schedule, seen.append )
+            self.assertEqual( list( range( 1, result.iterations+1 ) ), [ s.iteration for s in seen ] )
+            self.assertEqual( sorted( s.elapsed for s in seen ), [ s.elapsed for s in seen ] )
+            self.assertTrue( all( s.max_change >= 0 for s in seen ) )
+    def test_should_profile_phases( self ):
+        profile= rankings.Profile()
+        with contextlib.redirect_stdout( io.StringIO() ):
+            load_synthetic( profile=profile )
+        summary= profile.summary()
+        self.assertEqual( {'parse', 'games', 'solve'}, set( summary['phases'] ) )
+        self.assertEqual( 72, summary['games'] )
+        self.assertEqual( profile.iterations, summary['solver']['iterations'] )
+
+class TestSchedule( unittest.TestCase ):
+    def setUp( self ):
+        self.history= list( rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ) )
+        self.schedule= rankings.Schedule()
+        for h in self.history:
+            self.schedule.append( h, rankings.Football() )
+    def test_should_intern_teams( self ):
+        self.assertEqual( len(self.history), len(self.schedule) )
+        self.assertEqual( 24, len(self.schedule.names) )
+        for i, name in enumerate( self.schedule.names ):
+            self.assertEqual( i, self.schedule.ids[name] )
+    def test_should_produce_game_views( self ):
+        for h, g in zip( self.history, self.schedule ):
+            self.assertEqual( rankings.Game( h, rankings.Football() ), g )
+        self.assertEqual( rankings.Game( self.history[5], rankings.Football() ), self.schedule[5] )
+    def test_should_accumulate_team_stats( self ):
+        expected= {}
+        for h in self.history:
+            g= rankings.Game( h, rankings.Football() )
+            expected.setdefault( g.team1, rankings.Team( g.team1 ) ).updateStats( g.score1, g.score2, False )
+            expected.setdefault( g.team2, rankings.Team( g.team2 ) ).updateStats( g.score2, g.score1, True )
+        self.assertEqual( expected, self.schedule.teamTable().teams() )
+    def test_should_reject_invalid_scores_whole( self ):
+        for score in -5, 700:
+            with self.assertRaises( ValueError ):
+                self.schedule.extend( [ ("19790907", "Team 1", score, "Team 99", 3) ], rankings.Football() )
+            self.assertEqual( [72]*6, [ len( getattr( self.schedule, name ) ) for name in self.schedule.columns ] )
+            self.assertNotIn( "team 99", self.schedule.ids )
+
+class TestReaders( unittest.TestCase ):
+    csv_text= ( "team2,score2,date,team1,score1\r\n"
+                "Southampton,7,19790901,Churchland,14\r\n"
+                "\"Hampton, Roads\",21,19790901,Kecoughtan,21\r\n" )
+    def test_should_read_csv_columns_by_name( self ):
+        rows= list( rankings.CSVHistoryReader( io.StringIO( self.csv_text ) ) )
+        self.assertEqual( rankings.History( "19790901", "Churchland", "14", "Southampton", "7" ), rows[0] )
+        self.assertEqual( "Hampton, Roads", rows[1].team2 )
+    def test_should_reject_missing_csv_columns( self ):
+        with self.assertRaises( ValueError ):
+            list( rankings.CSVHistoryReader( io.StringIO( "date,team1,score1\n" ) ) )
+    def test_should_read_pipe_format_in_blocks( self ):
+        reader= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) )
+        reader.block_size= 7
+        rows= list( reader )
+        self.assertEqual( 72, len(rows) )
+        self.assertEqual( rows, list( rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ) ) )
+    def test_should_build_same_schedule_as_history( self ):
+        bulk= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+        expected= rankings.Schedule()
+        for h in rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ):
+            expected.append( h, rankings.Football() )
+        self.assertEqual( expected, bulk )
+
+class TestScheduleCache( unittest.TestCase ):
+    def setUp( self ):
+        import tempfile
+        self.directory= tempfile.TemporaryDirectory()
+        self.path= rankings.Path( self.directory.name ) / "scores.txt"
+        self.path.write_text( synthetic_season() )
+        self.cache= rankings.ScheduleCache( rankings.Path( self.directory.name ) / "cache" )
+    def tearDown( self ):
+        self.directory.cleanup()
+    def test_should_round_trip_schedule( self ):
+        sport= rankings.Football()
+        parsed= self.cache.schedule( self.path, rankings.PipeFormatHistoryReader, sport )
+        key= self.cache.key( self.path, rankings.PipeFormatHistoryReader, sport )
+        self.assertEqual( parsed, self.cache.get( key ) )
+        self.assertEqual( parsed, self.cache.schedule( self.path, rankings.PipeFormatHistoryReader, sport ) )
+    def test_should_key_on_content_and_sport( self ):
+        key= self.cache.key( self.path, rankings.PipeFormatHistoryReader, rankings.Football() )
+        self.assertNotEqual( key, self.cache.key( self.path, rankings.PipeFormatHistoryReader, rankings.Basketball() ) )
+        self.path.write_text( synthetic_season( seed=1 ) )
+        self.assertNotEqual( key, self.cache.key( self.path, rankings.PipeFormatHistoryReader, rankings.Football() ) )
+        self.assertIsNone( self.cache.get( key ) )
+
+class TestCompressedInput( unittest.TestCase ):
+    def setUp( self ):
+        import tempfile
+        self.directory= tempfile.TemporaryDirectory()
+        self.lines= synthetic_season().splitlines( keepends=True )
+    def tearDown( self ):
+        self.directory.cleanup()
+    def write( self, name, text, module=None ):
+        path= rankings.Path( self.directory.name ) / name
+        data= text.encode()
+        path.write_bytes( module.compress( data ) if module else data )
+        return path
+    def test_should_detect_compression_by_magic( self ):
+        import bz2, gzip, lzma
+        for module in gzip, bz2, lzma, None:
+            path= self.write( "scores.dat", synthetic_season(), module )
+            with rankings.openHistory( path ) as source:
+                self.assertEqual( synthetic_season(), source.read() )
+    def test_should_concatenate_files( self ):
+        import gzip, lzma
+        paths= [ self.write( "a.txt.gz", "".join( self.lines[:30] ), gzip ),
+                 self.write( "b.txt", "".join( self.lines[30:50] ) ),
+                 self.write( "c.txt.xz", "".join( self.lines[50:] ), lzma ) ]
+        rows= list( rankings.PipeFormatHistoryReader.readRows( paths ) )
+        self.assertEqual( list( rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).rows() ), rows )
+        cache= rankings.ScheduleCache( rankings.Path( self.directory.name ) / "cache" )
+        self.assertNotEqual( cache.key( paths, rankings.PipeFormatHistoryReader, rankings.Football() ),
+                             cache.key( paths[:2], rankings.PipeFormatHistoryReader, rankings.Football() ) )
+        self.assertEqual( 72, len( cache.schedule( paths, rankings.PipeFormatHistoryReader, rankings.Football() ) ) )
+
+class TestGameMerger( unittest.TestCase ):
+    rows= [ ("19790901", "Churchland", "14", "Southampton", "7"),
+            ("1979-09-01", "SOUTHAMPTON", "7", "churchland", "14"),
+            ("09/01/1979", "Churchland", "21", "Southampton", "7"),
+            ("19790908", "Churchland", "14", "Southampton", "7") ]
+    def test_should_normalize_dates( self ):
+        for text in "19790901", "1979-09-01", "09/01/1979", "9/1/79", "Sep 1, 1979":
+            self.assertEqual( "1979-09-01", rankings.normalizeDate( text ) )
+        self.assertEqual( "week 1", rankings.normalizeDate( " week 1 " ) )
+    def test_should_drop_duplicates_and_conflicts( self ):
+        flagged= []
+        merger= rankings.GameMerger( 'drop', lambda kind, row: flagged.append( kind ) )
+        kept= list( merger.rows( self.rows ) )
+        self.assertEqual( [ self.rows[0], self.rows[3] ], kept )
+        self.assertEqual( ['duplicate', 'conflict'], flagged )
+        self.assertEqual( rankings.MergeStats( 4, 2, 1, 1 ), merger.stats )
+    def test_should_flag_and_keep( self ):
+        merger= rankings.GameMerger( 'flag' )
+        self.assertEqual( self.rows, list( merger.rows( self.rows ) ) )
+        self.assertEqual( (1, 1), (merger.stats.duplicates, merger.stats.conflicts) )
+    def test_should_know_games_already_scheduled( self ):
+        schedule= rankings.Schedule()
+        schedule.extend( self.rows[:1], rankings.Football() )
+        merger= rankings.GameMerger()
+        merger.add( schedule )
+        self.assertEqual( [ self.rows[3] ], list( merger.rows( self.rows[1:] ) ) )
+    def test_should_keep_stats_in_schedule_cache( self ):
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            path= rankings.Path( directory ) / "scores.txt"
+            path.write_text( "".join( "|".join( row ) + "\n" for row in self.rows ) )
+            for mapped in False, True:
+                cache= rankings.ScheduleCache( rankings.Path( directory ) / str(mapped) )
+                for _ in range( 2 ):
+                    merger= rankings.GameMerger( 'drop' )
+                    schedule= cache.schedule( [path], rankings.PipeFormatHistoryReader,
+                                              rankings.Football(), mapped, merger )
+                    self.assertEqual( 2, len(schedule) )
+                    self.assertEqual( rankings.MergeStats( 4, 2, 1, 1 ), merger.stats )
+
+class TestResultCache( unittest.TestCase ):
+    def setUp( self ):
+        import tempfile
+        self.directory= tempfile.TemporaryDirectory()
+        rankings.ResultCache.memory.clear()
+        self.schedule= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+    def tearDown( self ):
+        self.directory.cleanup()
+        rankings.ResultCache.memory.clear()
+    def load( self, results, **kw ):
+        calls= []
+        with contextlib.redirect_stdout( io.StringIO() ):
+            _, _, TeamList= rankings.load( self.schedule, rankings.Football(),
+                observer=calls.append, results=results, **kw )
+        return TeamList, calls
+    def test_should_skip_solve_on_hit( self ):
+        expected, calls= self.load( rankings.ResultCache( self.directory.name ) )
+        self.assertTrue( calls )
+        rankings.ResultCache.memory.clear()
+        actual, calls= self.load( rankings.ResultCache( self.directory.name ) )
+        self.assertEqual( [], calls )
+        self.assertEqual( expected, actual )
+        _, calls= self.load( rankings.ResultCache() )
+        self.assertEqual( [], calls )
+    def test_should_key_on_parameters( self ):
+        cache= rankings.ResultCache()
+        key= cache.key( self.schedule, rankings.Football(), 'python', 'fixed' )
+        self.assertEqual( key, cache.key( self.schedule, rankings.Football(), 'python', 'fixed' ) )
+        self.assertNotEqual( key, cache.key( self.schedule, rankings.Football(), 'python', 'newton' ) )
+        self.assertNotEqual( key, cache.key( self.schedule, rankings.Football( 400.0 ), 'python', 'fixed' ) )
+        self.assertNotEqual( key, cache.key( self.schedule.subset( range(10) ), rankings.Football(), 'python', 'fixed' ) )
+    def test_should_evict_least_recently_used( self ):
+        import os
+        cache= rankings.ResultCache( self.directory.name )
+        teams= self.schedule.teamTable().teams()
+        result= rankings.SolverResult( 1, 0.0, True )
+        cache.put( 'a', teams, result )
+        cache.max_bytes= 2 * cache.entry( 'a' ).stat().st_size
+        os.utime( cache.entry( 'a' ), (1, 1) )
+        cache.put( 'b', teams, result )
+        os.utime( cache.entry( 'b' ), (2, 2) )
+        cache.get( 'a' )
+        cache.put( 'c', teams, result )
+        self.assertEqual( ['a.result', 'c.result'], sorted( p.name for p in rankings.Path( self.directory.name ).iterdir() ) )
+
+class TestPrintRankings( unittest.TestCase ):
+    def setUp( self ):
+        import argparse, tempfile
+        self.directory= tempfile.TemporaryDirectory()
+        self.output= rankings.Path( self.directory.name ) / "ranks.txt"
+        self.args= argparse.Namespace( output=str(self.output), csv_output=None,
+                                       formats=['text', 'csv', 'jsonl'] )
+        _, _, self.TeamList= load_synthetic()
+    def tearDown( self ):
+        self.directory.cleanup()
+    def test_should_write_all_formats( self ):
+        import csv, json
+        rankings.printRankings( self.args, self.TeamList )
+        text= self.output.read_text().splitlines()
+        with self.output.with_suffix( ".csv" ).open() as f:
+            rows= list( csv.DictReader( f ) )
+        lines= [ json.loads(l) for l in self.output.with_suffix( ".jsonl" ).read_text().splitlines() ]
+        self.assertEqual( 25, len(text) )
+        self.assertEqual( 24, len(rows) )
+        self.assertEqual( 24, len(lines) )
+        for rank, (t, r, j) in enumerate( zip( text[1:], rows, lines ), start=1 ):
+            self.assertEqual( rank, int(t[:4]) )
+            self.assertEqual( str(rank), r['Rank'] )
+            self.assertEqual( rank, j['rank'] )
+            self.assertEqual( r['Team'], j['team'] )
+            self.assertEqual( r['Rating'], "{0:.3f}".format( j['power'] ) )
+    def test_should_not_change_team_names( self ):
+        self.args.formats= ['csv']
+        rankings.printRankings( self.args, self.TeamList )
+        self.assertFalse( self.output.exists() )
+        for name, team in self.TeamList.items():
+            self.assertEqual( name, team.name )
+
+class TestSyntheticSeason( unittest.TestCase ):
+    def test_should_be_deterministic( self ):
+        import benchmark
+        first= list( benchmark.syntheticSeason( teams=40, games_per_team=5, leagues=2 ) )
+        self.assertEqual( first, list( benchmark.syntheticSeason( teams=40, games_per_team=5, leagues=2 ) ) )
+        self.assertEqual( 100, len(first) )
+    def test_should_round_trip_through_readers( self ):
+        import benchmark
+        for delimiter, reader in (None, rankings.CSVHistoryReader), ('|', rankings.PipeFormatHistoryReader):
+            text= io.StringIO()
+            history= list( benchmark.syntheticSeason( teams=10, games_per_team=3 ) )
+            benchmark.writeSeason( history, text, delimiter )
+            parsed= list( reader( io.StringIO( text.getvalue() ) ) )
+            self.assertEqual( [ (h.team1, str(h.score1)) for h in history ],
+                              [ (h.team1, h.score1) for h in parsed ] )
+
+class TestComponents( unittest.TestCase ):
+    def setUp( self ):
+        text= synthetic_season() + synthetic_season( teams=10, seed=1 ).replace( "Team", "Club" )
+        self.schedule= rankings.PipeFormatHistoryReader( io.StringIO( text ) ).schedule( rankings.Football() )
+    def test_should_find_groups( self ):
+        groups= self.schedule.components()
+        self.assertEqual( [72, 30], [ len(g) for g in groups ] )
+        self.assertEqual( {'club'}, { self.schedule.names[self.schedule.team1[i]].split()[0] for i in groups[1] } )
+    def test_should_solve_groups_separately( self ):
+        teams= self.schedule.teamTable().teams()
+        result= rankings.calcComponentRatings( teams, self.schedule, rankings.calcTeamRatings )
+        self.assertTrue( result.converged )
+        for text in synthetic_season(), synthetic_season( teams=10, seed=1 ).replace( "Team", "Club" ):
+            part= rankings.PipeFormatHistoryReader( io.StringIO( text ) ).schedule( rankings.Football() )
+            expected= part.teamTable().teams()
+            rankings.calcTeamRatings( expected, len(part), part )
+            for name, team in expected.items():
+                self.assertEqual( team.power, teams[name].power )
+    def test_should_warn( self ):
+        output= io.StringIO()
+        with contextlib.redirect_stdout( output ):
+            rankings.printComponentWarning( rankings.componentLabels(
+                self.schedule.team1, self.schedule.team2, len(self.schedule.names) ) )
+        self.assertIn( "2 groups", output.getvalue() )
+        self.assertIn( "24, 10", output.getvalue() )
+
+class TestPredictions( unittest.TestCase ):
+    def setUp( self ):
+        with contextlib.redirect_stdout( io.StringIO() ):
+            _, _, self.TeamList= load_synthetic()
+    def test_should_predict_matchups_in_chunks( self ):
+        matchups= [ ("1979-12-01", "Team {0}".format(i), "Team {0}".format((i*7)%24)) for i in range(24) ]
+        predicted= list( rankings.predictGames( self.TeamList, matchups, chunk_size=5 ) )
+        self.assertEqual( 24, len(predicted) )
+        for (date, t1, t2), (d, p1, p2, e) in zip( matchups, predicted ):
+            self.assertEqual( (date, t1, t2), (d, p1, p2) )
+            self.assertAlmostEqual( rankings.expectedGameResult(
+                self.TeamList[t1.casefold()].power, self.TeamList[t2.casefold()].power, 10.0 ), e )
+    def test_should_predict_all_pairs( self ):
+        chunks= list( rankings.predictAllPairs( self.TeamList, ["Team 1", "Team 2", "Team 3"] ) )
+        self.assertEqual( [2, 1], [ len(c) for c in chunks ] )
+        t1, t2, e= chunks[1][0]
+        self.assertEqual( ("team 2", "team 3"), (t1, t2) )
+        self.assertAlmostEqual( rankings.expectedGameResult(
+            self.TeamList[t1].power, self.TeamList[t2].power, 10.0 ), e )
+        self.assertEqual( 24*23//2, sum( len(c) for c in rankings.predictAllPairs( self.TeamList ) ) )
+    def test_should_read_matchups( self ):
+        rows= list( rankings.MatchupReader( io.StringIO( "team2,team1\nA,B\n" ) ) )
+        self.assertEqual( [("", "B", "A")], rows )
+        rows= list( rankings.MatchupReader( io.StringIO( "d|B|A\n" ), '|' ) )
+        self.assertEqual( [("d", "B", "A")], rows )
+
+class TestTimeline( unittest.TestCase ):
+    def setUp( self ):
+        self.schedule= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+    def test_should_cover_every_nth_date_and_the_last( self ):
+        timeline= rankings.calcTimeline( self.schedule, every=4 )
+        self.assertEqual( ['197904', '197906'], timeline.dates )
+        self.assertEqual( len(timeline.names)*2, len(timeline.ratings) )
+    def test_should_end_with_season_ratings( self ):
+        timeline= rankings.calcTimeline( self.schedule )
+        teams= self.schedule.teamTable().teams()
+        cold= rankings.calcTeamRatings( teams, len(self.schedule), self.schedule )
+        for name, team in teams.items():
+            self.assertAlmostEqual( team.power, timeline.rating( name, '197906' ), delta=0.05 )
+        self.assertLess( timeline.results[-1].iterations, cold.iterations )
+    def test_should_write_matrix( self ):
+        timeline= rankings.calcTimeline( self.schedule, every=3 )
+        target= io.StringIO()
+        timeline.write( target )
+        lines= target.getvalue().splitlines()
+        self.assertEqual( "Team,197903,197906", lines[0] )
+        self.assertEqual( 25, len(lines) )
+    def test_should_order_dates_by_calendar( self ):
+        history= "10/01/1979|A|10|B|7\n9/01/1979|A|3|B|7\n9/08/1979|B|14|A|21\n"
+        schedule= rankings.PipeFormatHistoryReader( io.StringIO( history ) ).schedule( rankings.Football() )
+        timeline= rankings.calcTimeline( schedule )
+        self.assertEqual( ['9/01/1979', '9/08/1979', '10/01/1979'], timeline.dates )
+        self.assertLess( timeline.rating( 'a', '9/01/1979' ), 100.0 )
+
+class TestRankingState( unittest.TestCase ):
+    def setUp( self ):
+        import tempfile
+        self.directory= tempfile.TemporaryDirectory()
+        self.path= rankings.Path( self.directory.name ) / "season.state"
+        lines= synthetic_season().splitlines( keepends=True )
+        self.first, self.second= "".join( lines[:40] ), "".join( lines[40:] )
+    def tearDown( self ):
+        self.directory.cleanup()
+    def test_should_ingest_incrementally( self ):
+        state= rankings.RankingState( rankings.Football() )
+        self.assertEqual( 40, state.ingest( rankings.PipeFormatHistoryReader( io.StringIO( self.first ) ).rows() ) )
+        state.solve()
+        state.save( self.path )
+        state= rankings.RankingState.open( self.path )
+        self.assertEqual( 32, state.ingest( rankings.PipeFormatHistoryReader( io.StringIO( self.second ) ).rows() ) )
+        whole= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+        self.assertEqual( whole, state.schedule )
+        for name, team in whole.teamTable().teams().items():
+            self.assertEqual( (team.won, team.lost, team.tied, team.pf, team.pa),
+                (state.teams[name].won, state.teams[name].lost, state.teams[name].tied,
+                 state.teams[name].pf, state.teams[name].pa) )
+    def test_should_save_ratings( self ):
+        state= rankings.RankingState( rankings.Basketball() )
+        state.ingest( rankings.PipeFormatHistoryReader( io.StringIO( self.first ) ).rows() )
+        state.solve()
+        state.save( self.path )
+        reopened= rankings.RankingState.open( self.path )
+        self.assertEqual( state.teams, reopened.teams )
+        self.assertEqual( state.sport, reopened.sport )
+
+class TestOutputFor( unittest.TestCase ):
+    def setUp( self ):
+        import argparse
+        self.args= argparse.Namespace( output=None, csv_output=None )
+    def test_should_keep_single_file_names( self ):
+        self.assertIs( self.args, rankings.outputFor( self.args, ["scores1979.txt"], 0 ) )
+    def test_should_separate_several_files( self ):
+        paths= [ "data/scores1979.txt", "data/scores1980.txt" ]
+        a= rankings.outputFor( self.args, paths, 0 )
+        self.assertEqual( "rankings_scores1979.csv", a.csv_output )
+        self.args.output= "out/ranks.txt"
+        a= rankings.outputFor( self.args, paths, 1 )
+        self.assertEqual( str(rankings.Path("out/ranks_scores1980.txt")), a.output )
+        self.assertEqual( "out/ranks.txt", self.args.output )
+    def test_should_label_files_with_the_same_name( self ):
+        self.assertEqual( ["scores1979", "scores1980"],
+                          rankings.outputLabels( ["scores1979.txt.gz", "scores1980.txt"] ) )
+        self.assertEqual( ["y1_scores", "y2_scores"],
+                          rankings.outputLabels( ["y1/scores.txt", "y2/scores.txt.bz2"] ) )
+        self.assertEqual( ["y1_scores_1", "y1_scores_2"],
+                          rankings.outputLabels( ["y1/scores.txt", "y1/scores.txt"] ) )
+
+class TestBootstrap( unittest.TestCase ):
+    def setUp( self ):
+        self.schedule= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+        with contextlib.redirect_stdout( io.StringIO() ):
+            _, _, self.TeamList= rankings.load( self.schedule, rankings.Football() )
+    def test_should_bracket_ratings_and_ranks( self ):
+        b= rankings.calcBootstrap( self.schedule, self.TeamList, replicates=40, batch_size=7 )
+        self.assertEqual( 40, b.replicates )
+        for i in range( len(b.names) ):
+            self.assertLessEqual( b.low[i], b.high[i] )
+            self.assertLessEqual( b.rank_low[i], b.rank_high[i] )
+            self.assertLessEqual( 1, b.rank_low[i] )
+    def test_should_repeat_with_seed_and_jobs( self ):
+        one= rankings.calcBootstrap( self.schedule, self.TeamList, replicates=10, batch_size=3 )
+        two= rankings.calcBootstrap( self.schedule, self.TeamList, replicates=10, batch_size=3, jobs=2 )
+        self.assertEqual( one, two )
+    def test_should_send_mapped_schedules_to_workers( self ):
+        import pickle, tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            path= rankings.Path( directory ) / "games.schedule"
+            self.schedule.save( path )
+            mapped, _= rankings.Schedule.open( path, mapped=True )
+            copy= mapped.inMemory()
+            self.assertEqual( self.schedule, pickle.loads( pickle.dumps( copy ) ) )
+            self.assertIs( self.schedule, self.schedule.inMemory() )
+            one= rankings.calcBootstrap( self.schedule, self.TeamList, replicates=4, batch_size=2 )
+            two= rankings.calcBootstrap( mapped, self.TeamList, replicates=4, batch_size=2, jobs=2 )
+            self.assertEqual( one, two )
+            del mapped
+    def test_should_write_csv( self ):
+        b= rankings.calcBootstrap( self.schedule, self.TeamList, replicates=5 )
+        target= io.StringIO()
+        b.write( target )
+        lines= target.getvalue().splitlines()
+        self.assertEqual( "Rank,Team,Rating,Low,High,Best Rank,Worst Rank", lines[0] )
+        self.assertEqual( 25, len(lines) )
+
+class TestTune( unittest.TestCase ):
+    def setUp( self ):
+        self.schedule= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+    def test_should_split_by_date( self ):
+        import tune
+        training, testing= tune.splitSeason( self.schedule, 0.5 )
+        self.assertEqual( ['197901', '197902', '197903'], sorted( training.dates ) )
+        self.assertEqual( ['197904', '197905', '197906'], sorted( testing.dates ) )
+        self.assertEqual( len(self.schedule), len(training) + len(testing) )
+    def test_should_split_by_calendar_date( self ):
+        import tune
+        schedule= rankings.Schedule()
+        schedule.extend( [ (date, "A", 7, "B", 3) for date in
+                           ("9/01/1979", "9/08/1979", "9/15/1979", "10/06/1979") ], rankings.Football() )
+        training, testing= tune.splitSeason( schedule, 0.5 )
+        self.assertEqual( ['9/01/1979', '9/08/1979'], training.dates )
+        self.assertEqual( ['9/15/1979', '10/06/1979'], testing.dates )
+    def test_should_rank_every_setting( self ):
+        import tune
+        settings= tune.grid( rankings.Football(), [300.0, 500.0], [3.0, 6.0] )
+        self.assertEqual( 4, len(settings) )
+        scores, timings= tune.sweep( self.schedule, rankings.Football, settings, batch_size=3 )
+        self.assertEqual( set(settings), { s.setting for s in scores } )
+        self.assertEqual( sorted( s.brier for s in scores ), [ s.brier for s in scores ] )
+        self.assertEqual( {'split', 'sweep', 'rate', 'score'}, set(timings) )
+        parallel, _= tune.sweep( self.schedule, rankings.Football, settings, jobs=2 )
+        self.assertEqual( [ (s.setting, s.brier) for s in scores ], [ (s.setting, s.brier) for s in parallel ] )
+    def test_should_use_exponent( self ):
+        sport= rankings.Football()
+        ratio= sport.lookupGameRatio( 21, 14 )
+        sport.exponent= 1.0
+        self.assertNotEqual( ratio, sport.lookupGameRatio( 21, 14 ) )
+        self.assertEqual( sport.gameRatio( 21, 14 ), sport.lookupGameRatio( 21, 14 ) )
+
+class TestService( unittest.TestCase ):
+    def setUp( self ):
+        import service
+        state= rankings.RankingState( rankings.Football() )
+        state.ingest( rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).rows() )
+        self.leagues= { "test": service.League( "test", state ) }
+    def test_should_answer_queries( self ):
+        import service
+        status, rows= service.handle( self.leagues, "GET", "/test/rankings?limit=3", b"" )
+        self.assertEqual( (200, [1, 2, 3]), (status, [ r['rank'] for r in rows ]) )
+        status, row= service.handle( self.leagues, "GET", "/test/teams/Team%205", b"" )
+        self.assertEqual( "TEAM 5", row['team'] )
+        status, p= service.handle( self.leagues, "GET", "/test/predict?team1=Team+1&team2=Team+2", b"" )
+        self.assertGreater( p['expected'], 0.0 )
+        with self.assertRaises( service.HTTPError ) as raised:
+            service.handle( self.leagues, "GET", "/test/teams/nobody", b"" )
+        self.assertEqual( 404, raised.exception.status )
+    def test_should_resolve_in_background( self ):
+        import asyncio, service
+        league= self.leagues["test"]
+        async def post():
+            status, value= service.handle( self.leagues, "POST", "/test/games",
+                b'[["19790701", "Team 1", 35, "Team 2", 0]]' )
+            self.assertEqual( 1, league.ratings.version )
+            await league.task
+            return status
+        self.assertEqual( 202, asyncio.run( post() ) )
+        self.assertEqual( (2, 73), (league.ratings.version, league.ratings.games) )
+        self.assertIsNone( league.task )
+    def test_should_reject_impossible_scores( self ):
+        import service
+        for body in b'[["d", "Team 1", -5, "Team 9", 3]]', b'[["d", "Team 1", 600, "Team 9", 3]]':
+            with self.assertRaises( service.HTTPError ) as raised:
+                service.handle( self.leagues, "POST", "/test/games", body )
+            self.assertEqual( 400, raised.exception.status )
+        self.assertEqual( [], self.leagues["test"].pending )
+    def test_should_keep_serving_after_failed_update( self ):
+        import asyncio, service
+        league= self.leagues["test"]
+        async def post():
+            league.submit( [ ("d", "Team 1", -5, "Team 9", 3) ] )
+            await league.task
+        with contextlib.redirect_stderr( io.StringIO() ) as errors:
+            asyncio.run( post() )
+        self.assertIn( "update failed", errors.getvalue() )
+        self.assertEqual( (1, 72), (league.ratings.version, league.ratings.games) )
+        self.assertEqual( 72, len(league.state.schedule.game_ratio) )
+        self.assertIsNone( league.task )
+
+@unittest.skipIf( rankings.np is None, "numpy not installed" )
+class TestNumpyEngine( unittest.TestCase ):
+    def test_should_match_python_engine( self ):
+        _, _, expected= load_synthetic( engine='python' )
+        _, _, actual= load_synthetic( engine='numpy' )
+        self.assertEqual( set(expected), set(actual) )
+        for name, team in expected.items():
+            self.assertAlmostEqual( team.power, actual[name].power )
+
+@unittest.skipIf( rankings.np is None, "numpy not installed" )
+class TestChunkedEngine( unittest.TestCase ):
+    def setUp( self ):
+        import tempfile
+        self.directory= tempfile.TemporaryDirectory()
+        self.path= rankings.Path( self.directory.name ) / "games.schedule"
+    def tearDown( self ):
+        self.directory.cleanup()
+    def test_should_stream_rows_to_file( self ):
+        rows= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).rows()
+        rankings.Schedule.saveRows( self.path, rows, rankings.Football(), chunk_size=10 )
+        expected= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+        self.assertEqual( expected, rankings.Schedule.open( self.path )[0] )
+        mapped, _= rankings.Schedule.open( self.path, mapped=True )
+        self.assertIsInstance( mapped.team1, memoryview )
+        self.assertEqual( list(expected.game_ratio), list(mapped.game_ratio) )
+    def test_should_match_numpy_engine( self ):
+        schedule= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).schedule( rankings.Football() )
+        schedule.save( self.path )
+        mapped, _= rankings.Schedule.open( self.path, mapped=True )
+        expected= schedule.teamTable().teams()
+        rankings.calcTeamRatingsArray( expected, len(schedule), schedule )
+        actual= mapped.teamTable().teams()
+        result= rankings.calcTeamRatingsChunked( actual, len(mapped), mapped, chunk_size=7 )
+        self.assertTrue( result.converged )
+        for name, team in expected.items():
+            self.assertAlmostEqual( team.power, actual[name].power )
+
+@unittest.skipIf( rankings.np is None, "numpy not installed" )
+class TestNewtonSolver( unittest.TestCase ):
+    def test_should_reach_fixed_step_ratings( self ):
+        _, _, expected= load_synthetic( solver='fixed' )
+        _, _, actual= load_synthetic( solver='newton' )
+        for name, team in expected.items():
+            self.assertAlmostEqual( team.power, actual[name].power, delta=0.05 )
+    def test_should_report_iterations_and_residual( self ):
+        reader= rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) )
+        teams, schedule= {}, []
+        for h in reader:
+            g= rankings.Game( h, rankings.Football() )
+            schedule.append( g )
+            teams.setdefault( g.team1, rankings.Team( g.team1 ) ).updateStats( g.score1, g.score2 )
+            teams.setdefault( g.team2, rankings.Team( g.team2 ) ).updateStats( g.score2, g.score1 )
+        result= rankings.calcTeamRatingsNewton( teams, len(schedule), schedule )
+        self.assertTrue( result.converged )
+        self.assertLess( result.iterations, 20 )
+        self.assertGreater( result.sweeps, 2*result.iterations )
+        self.assertLess( result.residual, 1e-9 )
+        self.assertAlmostEqual( 100.0, sum( t.power for t in teams.values() )/len(teams) )
+    def test_should_converge_around_a_shutout_blowout( self ):
+        # Team 99's only game is a 49-0 win, a game ratio over 1 that no
+        # finite rating can match.
+        season= synthetic_season()
+        blowout= rankings.PipeFormatHistoryReader(
+            io.StringIO( season + "197907|Team 99|49|Team 1|0\n" ) ).schedule( rankings.Football() )
+        plain= rankings.PipeFormatHistoryReader( io.StringIO( season ) ).schedule( rankings.Football() )
+        teams= blowout.teamTable().teams()
+        result= rankings.calcTeamRatingsNewton( teams, len(blowout), blowout )
+        self.assertTrue( result.converged )
+        self.assertGreater( teams['team 99'].power, teams['team 1'].power )
+        expected= plain.teamTable().teams()
+        rankings.calcTeamRatingsNewton( expected, len(plain), plain )
+        for name, team in expected.items():
+            self.assertAlmostEqual( team.power, teams[name].power, delta=1e-6 )
+
+@unittest.skipIf( rankings.np is None, "numpy not installed" )
+class TestHomeField( unittest.TestCase ):
+    def setUp( self ):
+        # The same season, with the home team (team2) 8 points better off.
+        rows= [ (d, t1, s1, t2, int(s2)+8) for d, t1, s1, t2, s2 in
+                rankings.PipeFormatHistoryReader( io.StringIO( synthetic_season() ) ).rows() ]
+        self.schedule= rankings.Schedule()
+        self.schedule.extend( rows, rankings.Football() )
+    def test_should_split_home_and_visitor_records( self ):
+        table= self.schedule.teamTable( chunk_size=7 )
+        teams= table.teams()
+        for team in teams.values():
+            for name in ('won', 'lost', 'tied', 'pf', 'pa'):
+                self.assertEqual( getattr(team, name), getattr(team, 'h'+name) + getattr(team, 'v'+name) )
+        expected= rankings.TeamTable( self.schedule.names )
+        s= self.schedule
+        for t1, s1, t2, s2 in zip( s.team1, s.score1, s.team2, s.score2 ):
+            expected.updateStats( t1, s1, s2, False )
+            expected.updateStats( t2, s2, s1, True )
+        self.assertEqual( expected.teams(), teams )
+    def test_should_fit_same_home_advantage_with_every_engine( self ):
+        results= {}
+        for engine, calc in [ ('python', rankings.calcTeamRatings),
+                              ('numpy', rankings.calcTeamRatingsArray),
+                              ('chunked', rankings.calcTeamRatingsChunked),
+                              ('newton', rankings.calcTeamRatingsNewton) ]:
+            teams= self.schedule.teamTable().teams()
+            results[engine]= calc( teams, len(self.schedule), self.schedule, home_field=True )
+            self.assertTrue( results[engine].converged, engine )
+        self.assertGreater( results['python'].home_advantage, 0.0 )
+        for result in results.values():
+            self.assertAlmostEqual( results['python'].home_advantage, result.home_advantage, delta=0.01 )
+    def test_should_take_as_many_newton_steps_with_home_field( self ):
+        steps= {}
+        for home_field in (False, True):
+            teams= self.schedule.teamTable().teams()
+            steps[home_field]= rankings.calcTeamRatingsNewton( teams, len(self.schedule), self.schedule,
+                                                               home_field=home_field ).iterations
+        self.assertLessEqual( steps[True], steps[False] + 1 )
+    def test_should_leave_ratings_alone_without_home_field( self ):
+        # Ratings from the solver as it was before the home-field term.
+        with contextlib.redirect_stdout( io.StringIO() ):
+            _, _, TeamList= load_synthetic()
+        self.assertAlmostEqual( 95.13638993137204, TeamList["team 0"].power, places=9 )
+        self.assertAlmostEqual( 101.02059913122734, TeamList["team 7"].power, places=9 )
+        self.assertAlmostEqual( 89.25890585890278, TeamList["team 23"].power, places=9 )
+    def test_should_save_home_advantage_in_state( self ):
+        import tempfile
+        state= rankings.RankingState( rankings.Football() )
+        state.ingest( [ (self.schedule.dates[d], self.schedule.names[t1], s1, self.schedule.names[t2], s2)
+                        for d, t1, s1, t2, s2 in zip( self.schedule.date, self.schedule.team1,
+                                                     self.schedule.score1, self.schedule.team2,
+                                                     self.schedule.score2 ) ] )
+        result= state.solve( home_field=True )
+        self.assertGreater( state.home_advantage, 0.0 )
+        self.assertEqual( result.home_advantage, state.home_advantage )
+        with tempfile.TemporaryDirectory() as directory:
+            path= rankings.Path( directory ) / "state"
+            state.save( path )
+            self.assertEqual( state.home_advantage, rankings.RankingState.open( path ).home_advantage )
+    def test_should_not_solve_groups_separately( self ):
+        with self.assertRaises( ValueError ):
+            load_synthetic( home_field=True, components=True )
+    def test_should_add_home_advantage_to_predictions( self ):
+        teams= { "a": rankings.Team( "a", power=100.0 ), "b": rankings.Team( "b", power=100.0 ) }
+        [(_, _, _, e)]= rankings.predictGames( teams, [("", "a", "b")], home_advantage=2.0 )
+        self.assertAlmostEqual( rankings.expectedGameResult( 100.0, 102.0, 10.0 ), e )
+        self.assertLess( e, 0.5 )
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""Team Rankings parameter sweep.
+
+Synopsis
+==========
+
+    tune.py [-sport] [-d '|'] scores.txt [--score-factor 300,500,700]
+        [--max-score 3,6,7] [--exponent 1.5,1.618] [--kfactor 5,10,20]
+        [--train 0.5] [--jobs 4] [--top 10]
+
+Options
+==========
+
+The "-sport" and "-d" options are as for ``rankings.py``.  The history
+file may be compressed, and ``-`` is standard input.  The season is parsed
+once.
+
+The "--score-factor", "--max-score", "--exponent" and "--kfactor" options
+each take a comma-separated list of values; every combination is tried.
+The first three are the fields of :class:`rankings.SportFactor` and default
+to the sport's own values.  "--kfactor" is the solvers' K factor and
+defaults to 10.  At the fixed point the K factor only rescales the ratings,
+so it changes the predictions only through where the solver stops.
+
+The "--train" option is the fraction of the season's dates, the earliest
+ones, whose games are rated.  Each setting is scored on how well those
+ratings predict the games of the remaining dates: the Brier score of the
+expected result against the actual result (1 for a win, 0.5 for a tie, 0
+for a loss), where lower is better, and the fraction of decided games
+whose favorite won.  Games involving a team that didn't play in the
+training dates are skipped.
+
+The "--jobs" option evaluates the settings in a pool of worker processes;
+each worker receives the season once.  The "--engine" and "--solver"
+options are passed to the rating solve.
+
+The "--top" option is the number of settings to show, best first.  A
+timing breakdown follows: parsing, splitting the season, the whole sweep,
+and the total time spent rating and scoring.
+"""
+
+import argparse
+import dataclasses
+import itertools
+import time
+from array import array
+from dataclasses import dataclass
+
+import rankings
+
+
+@dataclass(slots=True, frozen=True)
+class Setting:
+
+    """One point of the parameter grid."""
+    score_factor: float
+    max_score: float
+    exponent: float
+    kfactor: float
+
+
+@dataclass(slots=True)
+class Score:
+
+    """How well one :class:`Setting` predicted the later games."""
+    setting: Setting
+    brier: float
+    accuracy: float
+    games: int
+    skipped: int
+    iterations: int
+    rate: float
+    score: float
+
+
+def splitSeason(schedule, train=0.5):
+    """Split a :class:`rankings.Schedule` by date.
+
+    Returns two schedules: the games of the earliest ``train`` fraction of
+    the dates, and the games of the rest.  Dates are ordered as
+    :func:`rankings.normalizeDate` reads them.
+    """
+    dates = sorted(range(len(schedule.dates)),
+                   key=lambda i: rankings.normalizeDate(schedule.dates[i]))
+    cutoff = set(dates[:round(train * len(dates))])
+    early = [i for i in range(len(schedule)) if schedule.date[i] in cutoff]
+    late = [i for i in range(len(schedule)) if schedule.date[i] not in cutoff]
+    return schedule.subset(early), schedule.subset(late)
+
+
+def grid(sport, score_factors=None, max_scores=None, exponents=None, kfactors=None):
+    """Every combination of the given values; the ``sport``'s own value
+    is used for any list that is ``None``."""
+    return [Setting(*values) for values in itertools.product(
+        score_factors or [sport.score_factor], max_scores or [sport.max_score],
+        exponents or [sport.exponent], kfactors or [10.0])]
+
+
+def evaluate(settings):
+    """Rate the training games and score the testing games with each
+    :class:`Setting`.  Returns a list of :class:`Score`.  The season and
+    solver come from :func:`rankings.workerState`."""
+    season = rankings.workerState()
+    sport_class, training, testing, calc = (
+        season['sport_class'], season['training'], season['testing'], season['calc'])
+    scores = []
+    for setting in settings:
+        start = time.perf_counter()
+        sport = sport_class(setting.score_factor, setting.max_score, setting.exponent)
+        # Each setting is used once, so building its game ratio table
+        # would cost far more than the training games themselves.
+        rated = dataclasses.replace(training, game_ratio=array(
+            'd', map(sport.gameRatio, training.score1, training.score2)))
+        teams = rated.teamTable().teams()
+        result = calc(teams, len(rated), rated, kfactor=setting.kfactor)
+        rated_at = time.perf_counter()
+
+        brier, correct, decided, games = 0.0, 0, 0, 0
+        names = testing.names
+        for t1, t2, s1, s2 in zip(testing.team1, testing.team2, testing.score1, testing.score2):
+            team1, team2 = teams.get(names[t1]), teams.get(names[t2])
+            if team1 is None or team2 is None:
+                continue
+            expected = rankings.expectedGameResult(team1.power, team2.power, setting.kfactor)
+            actual = 1.0 if s1 > s2 else 0.5 if s1 == s2 else 0.0
+            brier += (expected - actual) ** 2
+            games += 1
+            if s1 != s2:
+                decided += 1
+                correct += (expected > 0.5) == (s1 > s2)
+        scores.append(Score(setting, brier / games if games else float('nan'),
+                            correct / decided if decided else float('nan'),
+                            games, len(testing) - games, result.iterations,
+                            rated_at - start, time.perf_counter() - rated_at))
+    return scores
+
+
+def sweep(schedule, sport_class, settings, train=0.5, engine='python', solver='fixed',
+          jobs=1, batch_size=4):
+    """Evaluate every setting on a season.
+
+    Returns the list of :class:`Score`, best (lowest Brier score) first,
+    and a dict of timings.
+    """
+    timings = {}
+    start = time.perf_counter()
+    training, testing = splitSeason(schedule, train)
+    timings['split'] = time.perf_counter() - start
+
+    calc = rankings.SOLVERS[solver] or rankings.ENGINES[engine]
+    batches = [settings[i:i + batch_size] for i in range(0, len(settings), batch_size)]
+    start = time.perf_counter()
+    results = rankings.mapWithState(evaluate, batches, jobs, sport_class=sport_class,
+                                    training=training, testing=testing, calc=calc)
+    timings['sweep'] = time.perf_counter() - start
+
+    scores = list(itertools.chain.from_iterable(results))
+    timings['rate'] = sum(s.rate for s in scores)
+    timings['score'] = sum(s.score for s in scores)
+    scores.sort(key=lambda s: s.brier)
+    return scores, timings
+
+
+def printScores(scores, top=10):
+    """Print the best settings, one per line."""
+    print('{0:>12s} {1:>9s} {2:>8s} {3:>7s} {4:>8s} {5:>8s} {6:>6s} {7:>10s}'.format(
+        'score_factor', 'max_score', 'exponent', 'kfactor', 'brier', 'accuracy',
+        'games', 'iterations'))
+    for s in scores[:top]:
+        print('{0.score_factor:12g} {0.max_score:9g} {0.exponent:8.4g} {0.kfactor:7g} '
+              '{1.brier:8.5f} {1.accuracy:8.4f} {1.games:6d} {1.iterations:10d}'.format(
+                  s.setting, s))
+
+
+def floatList(text):
+    return [float(value) for value in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rankings parameter sweep')
+    parser.add_argument('-football', dest='sport_class', action='store_const',
+                        const=rankings.Football, default=rankings.SportFactor)
+    parser.add_argument('-basketball', dest='sport_class', action='store_const',
+                        const=rankings.Basketball)
+    parser.add_argument('-d', dest='format', action='store')
+    parser.add_argument('file', help='History file')
+    parser.add_argument('--score-factor', type=floatList)
+    parser.add_argument('--max-score', type=floatList)
+    parser.add_argument('--exponent', type=floatList)
+    parser.add_argument('--kfactor', type=floatList)
+    parser.add_argument('--train', type=float, default=0.5,
+                        help='Fraction of the dates to rate; the rest are predicted')
+    parser.add_argument('--engine', choices=sorted(rankings.ENGINES), default='python')
+    parser.add_argument('--solver', choices=list(rankings.SOLVERS), default='fixed')
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    reader_class = rankings.readerClass(args.format)
+
+    sport = args.sport_class()
+    start = time.perf_counter()
+    with rankings.openHistory(args.file) as source:
+        schedule = reader_class(source).schedule(sport)
+    parse = time.perf_counter() - start
+
+    settings = grid(sport, args.score_factor, args.max_score, args.exponent, args.kfactor)
+    scores, timings = sweep(schedule, args.sport_class, settings, args.train,
+                            args.engine, args.solver, args.jobs)
+    printScores(scores, args.top)
+    print()
+    for name, value in {'parse': parse, **timings}.items():
+        print('{0:>14s} {1:12.6f}'.format(name, value))
+    print('{0:>14s} {1:12d}'.format('settings', len(settings)))
+
+
+if __name__ == "__main__":
+    main()